@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from utils.bk_tree import levenshtein
+from utils.data_cleaning import map_unique
+from utils.union_find import connected_components
+
+# Dua nama dianggap orang yang sama jika kemiripannya >= NAME_SIMILARITY_THRESHOLD
+# dan ada bukti kontak (lihat _contact_keys)
+NAME_SIMILARITY_THRESHOLD = 0.85
+# Sorted neighborhood: tiap baris hanya dibandingkan dengan WINDOW - 1 tetangga setelahnya di urutan blok
+NEIGHBOR_WINDOW = 5
+# Nama user email (sebelum "@") baru menjadi bukti jika cukup panjang: "andi@gmail.com" & "andi@yahoo.com"
+# belum tentu orang yang sama
+EMAIL_USER_MIN_LEN = 6
+# Nama mirip tanpa bukti kontak hanya dilaporkan sebagai kemungkinan, dengan keyakinan dikali faktor ini
+NAME_ONLY_CONFIDENCE = 0.5
+
+def _normalize_name_values(s: pd.Series) -> pd.Series:
+    # huruf kecil tanpa aksen & tanda baca, token diurutkan ("Santoso, Budi" == "budi santoso")
+    s = (
+        s.astype(str)
+         .str.normalize("NFKD")
+         .str.encode("ascii", "ignore")
+         .str.decode("ascii")
+         .str.lower()
+         .str.replace(r"[^a-z0-9 ]", " ", regex=True)
+    )
+    return s.str.split().map(lambda tokens: " ".join(sorted(tokens)))
+
+def normalize_names(s: pd.Series) -> pd.Series:
+    return map_unique(s, _normalize_name_values)
+
+def name_similarity(a: str, b: str) -> float:
+    """1 - edit distance / panjang nama terpanjang (1.0 = identik)."""
+    if not a or not b:
+        return 0.0
+    return 1 - levenshtein(a, b) / max(len(a), len(b))
+
+def _codes(values: pd.Series) -> np.ndarray:
+    # Kode integer per nilai; kosong -> -1
+    return pd.factorize(values)[0]
+
+def _contact_keys(customers: pd.DataFrame) -> list:
+    """
+    Kunci kontak yang menjadi bukti bahwa dua baris orang yang sama:
+    phone sama, email sama, atau nama user email sama (domain berbeda, minimal EMAIL_USER_MIN_LEN huruf).
+    """
+    keys = []
+    if "Attendee Phone" in customers.columns:
+        keys.append(_codes(customers["Attendee Phone"]))
+    if "Attendee Email" in customers.columns:
+        email = customers["Attendee Email"]
+        user = email.astype("string").str.split("@", n=1).str[0]
+        keys += [_codes(email), _codes(user.where(user.str.len() >= EMAIL_USER_MIN_LEN))]
+    return keys
+
+def _neighbor_pairs(block: np.ndarray, order_key: np.ndarray, window: int) -> np.ndarray:
+    """
+    Pasangan kandidat (i, j) dari sorted neighborhood: urutkan per (block, order_key),
+    lalu pasangkan tiap baris dengan window - 1 baris berikutnya di blok yang sama.
+    """
+    order = np.lexsort((order_key, block))
+    pairs = []
+    for k in range(1, window):
+        left, right = order[:-k], order[k:]
+        same = block[left] == block[right]
+        pairs.append(np.column_stack([left[same], right[same]]))
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+
+def dedupe_names(
+    customers: pd.DataFrame,
+    threshold: float = NAME_SIMILARITY_THRESHOLD,
+    window: int = NEIGHBOR_WINDOW,
+) -> pd.DataFrame:
+    """
+    Kelompokkan customer dengan nama mirip (varian penulisan / typo) memakai blocking,
+    sehingga kemiripan hanya dihitung di dalam blok (biaya ~linear, bukan kuadratik). Kandidat dari:
+    - blok kunci kontak (phone, email, nama user email)
+    - sorted neighborhood atas nama ternormalisasi, maju dan terbalik (menangkap typo di awal nama)
+    Dua baris hanya digabung jika namanya mirip DAN berbagi kunci kontak; anggota keluarga dengan
+    nama berbeda tetap terpisah, dan "Siti" yang kontaknya berbeda tidak digabung.
+
+    Return: salinan customers +
+    - "Name Cluster"               : baris pertama cluster (int)
+    - "Name Confidence"            : kemiripan tertinggi ke anggota cluster lain (1.0 jika sendiri)
+    - "Possible Match"             : cluster lain dengan nama mirip tanpa bukti kontak (<NA> jika tidak ada)
+    - "Possible Match Confidence"  : kemiripan nama tersebut x NAME_ONLY_CONFIDENCE
+    """
+    n = len(customers)
+    names = normalize_names(customers["Attendee Name"]).fillna("").to_numpy(dtype=object)
+    # Kode nama unik (urut alfabet) dipakai untuk sorting & untuk menghitung kemiripan sekali per pasangan nama
+    name_code, unique_names = pd.factorize(pd.Series(names), sort=True)
+    unique_names = unique_names.to_numpy(dtype=object)
+    reversed_rank = pd.factorize(pd.Series([name[::-1] for name in names]), sort=True)[0]
+    contact_keys = _contact_keys(customers)
+
+    no_block = np.zeros(n, dtype=np.int64)
+    candidates = [
+        _neighbor_pairs(no_block, name_code, window),
+        _neighbor_pairs(no_block, reversed_rank, window),
+    ]
+    for codes in contact_keys:
+        # baris tanpa kontak mendapat blok sendiri (tidak dipasangkan)
+        block = np.where(codes >= 0, codes, -1 - np.arange(n))
+        candidates.append(_neighbor_pairs(block, name_code, window))
+
+    pairs = np.sort(np.concatenate(candidates), axis=1)
+    pairs = np.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+
+    # Kemiripan per pasangan nama unik; nama identik = 1, selisih panjang terlalu besar dilewati
+    lo = np.minimum(name_code[pairs[:, 0]], name_code[pairs[:, 1]]).astype(np.int64)
+    hi = np.maximum(name_code[pairs[:, 0]], name_code[pairs[:, 1]]).astype(np.int64)
+    name_pairs, inverse = np.unique(lo * len(unique_names) + hi, return_inverse=True)
+    a, b = name_pairs // max(len(unique_names), 1), name_pairs % max(len(unique_names), 1)
+    length = np.array([len(name) for name in unique_names], dtype=np.int64)
+    longest = np.maximum(length[a], length[b])
+    possible = (a != b) & (1 - np.abs(length[a] - length[b]) / np.maximum(longest, 1) >= threshold)
+
+    pair_similarity = np.where((a == b) & (length[a] > 0), 1.0, 0.0)
+    pair_similarity[possible] = [name_similarity(unique_names[i], unique_names[j]) for i, j in zip(a[possible], b[possible])]
+    similarity = pair_similarity[inverse.ravel()]
+
+    # Bukti kontak per pasangan: minimal satu kunci kontak sama (dan tidak kosong)
+    evidence = np.zeros(len(pairs), dtype=bool)
+    for codes in contact_keys:
+        left, right = codes[pairs[:, 0]], codes[pairs[:, 1]]
+        evidence |= (left >= 0) & (left == right)
+
+    similar = similarity >= threshold
+    linked = pairs[similar & evidence]
+    labels = connected_components(linked[:, 0], linked[:, 1], n)
+
+    confidence = np.ones(n)
+    if len(linked):
+        best = np.zeros(n)
+        linked_sim = similarity[similar & evidence]
+        np.maximum.at(best, linked[:, 0], linked_sim)
+        np.maximum.at(best, linked[:, 1], linked_sim)
+        confidence = np.where(best > 0, best, 1.0)
+
+    # Nama mirip tanpa bukti kontak (dan belum satu cluster): dilaporkan terpisah, keyakinan lebih rendah
+    name_only = pairs[similar & ~evidence]
+    name_only_sim = similarity[similar & ~evidence]
+    apart = labels[name_only[:, 0]] != labels[name_only[:, 1]]
+    name_only, name_only_sim = name_only[apart], name_only_sim[apart]
+    match = np.full(n, -1, dtype=np.int64)
+    match_score = np.zeros(n)
+    if len(name_only):
+        # kedua arah; per baris ambil pasangan dengan kemiripan tertinggi (seri -> cluster terkecil)
+        rows = np.concatenate([name_only[:, 0], name_only[:, 1]])
+        other = labels[np.concatenate([name_only[:, 1], name_only[:, 0]])]
+        score = np.concatenate([name_only_sim, name_only_sim])
+        order = np.lexsort((other, -score, rows))
+        first = np.unique(rows[order], return_index=True)[1]
+        match[rows[order][first]] = other[order][first]
+        match_score[rows[order][first]] = score[order][first] * NAME_ONLY_CONFIDENCE
+
+    out = customers.copy()
+    out["Name Cluster"] = labels
+    out["Name Confidence"] = confidence.round(3)
+    out["Possible Match"] = pd.arrays.IntegerArray(match, match < 0)
+    out["Possible Match Confidence"] = np.where(match >= 0, match_score.round(3), np.nan)
+    return out
@@ -1,5 +1,22 @@
+import hashlib
+import multiprocessing as mp
+import os
 import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from cachetools import LRUCache
+
+from utils.bk_tree import bk_search, build_bk_tree, levenshtein
+from utils.contact_cache import cached_map
+from utils.data_cleaning import map_unique
+from utils.union_find import connected_components
 
 # --- Validasi nomor ponsel Indonesia ---
 _VALID_PREFIXES = (
@@ -33,6 +50,42 @@ def clean_phone(phone):
             return s
     return None
 
+# Aturan prefix clean_phone, dicek berurutan: (awalan, jumlah karakter yang dibuang sebelum ditambah "62")
+_PHONE_PREFIX_RULES = (
+    ("+62", 3), ("620", 3), ("62+", 3), ("0062", 4), ("0", 1),
+    ("68", 1), ("608", 2), ("6262", 4), ("6228", 3), ("8", 0),
+)
+_VALID_PREFIX_SET = frozenset(_VALID_PREFIXES)
+
+def _normalize_phone_values(s: pd.Series) -> pd.Series:
+    s = s.astype(str).str.strip().str.replace(r"[^\d+]", "", regex=True)
+    fixed = s.copy()
+    pending = np.ones(len(s), dtype=bool)
+    for prefix, cut in _PHONE_PREFIX_RULES:
+        hit = pending & s.str.startswith(prefix).to_numpy(dtype=bool)
+        fixed[hit] = "62" + s[hit].str[cut:]
+        pending &= ~hit
+    valid = (
+        fixed.str.startswith("62")
+        & fixed.str.fullmatch(_MOBILE_RE.pattern)
+        & fixed.str[2:5].isin(_VALID_PREFIX_SET)
+    )
+    return fixed.where(valid.to_numpy(dtype=bool), None)
+
+def _rules_version(*rules) -> str:
+    # Kunci versi cache: berubah otomatis jika aturan normalisasi diubah
+    return hashlib.blake2b(repr(rules).encode(), digest_size=8).hexdigest()
+
+def normalize_phones(s: pd.Series, cache: bool = False) -> pd.Series:
+    """
+    Versi kolom dari clean_phone: hasil identik, tetapi hanya nilai unik yang diproses (operasi string vektor).
+    cache=True : hasil per nomor mentah disimpan di cache disk (utils.contact_cache) untuk upload berikutnya.
+    """
+    if not cache:
+        return map_unique(s, _normalize_phone_values)
+    version = _rules_version(_VALID_PREFIXES, _MOBILE_RE.pattern, _PHONE_PREFIX_RULES)
+    return map_unique(s, lambda u: cached_map("phone", version, u, _normalize_phone_values))
+
 # --- Validasi & normalisasi email ---
 _EMAIL_RE = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
 _COMMON_DOMAINS = {
@@ -45,7 +98,85 @@ _COMMON_DOMAINS = {
     "outlok.com": "outlook.com",
 }
 
-def clean_email(email):
+# Domain yang dikenal: domain lain yang mirip (typo) dapat dikoreksi ke domain terdekat di sini (opsional).
+# Satu koreksi per domain: label pertama (sufiks sama) ATAU sufiks (label persis dikenal), tidak keduanya,
+# sehingga "yahoo.co.jp" tidak pernah menjadi "yahoo.co.id". Domain sah yang mirip domain populer
+# (mis. ymail.com) harus ada di daftar.
+KNOWN_EMAIL_DOMAINS = [
+    "gmail.com", "googlemail.com",
+    "yahoo.com", "yahoo.co.id", "ymail.com", "rocketmail.com",
+    "hotmail.com", "outlook.com", "outlook.co.id", "live.com",
+    "icloud.com", "mail.com", "aol.com",
+]
+# Jarak edit maksimal antar label (pertukaran dua huruf bersebelahan dihitung 1)
+DOMAIN_MAX_DISTANCE = 1
+# Label lebih pendek dari ini hanya dikoreksi jika unik & satu huruf hilang / lebih ("gmai", "yaho");
+# substitusi / pertukaran pada label pendek sering berupa domain sah ("lime.com", "ail.com")
+DOMAIN_MIN_LABEL = 5
+
+def _is_transposition(a: str, b: str) -> bool:
+    # a & b sama kecuali dua huruf bersebelahan yang ditukar ("gmial" vs "gmail")
+    if len(a) != len(b):
+        return False
+    diff = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+    return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+
+@lru_cache(maxsize=None)
+def _label_trees(known: tuple) -> dict:
+    # Satu BK-tree label per sufiks: {"com": tree(gmail, yahoo, ...), "co.id": tree(yahoo, outlook)}
+    labels = {}
+    for domain in known:
+        label, _, suffix = domain.partition(".")
+        labels.setdefault(suffix, []).append(label)
+    return {suffix: build_bk_tree(words) for suffix, words in labels.items()}
+
+@lru_cache(maxsize=None)
+def _label_suffixes(known: tuple) -> dict:
+    # Sufiks yang dikenal per label: {"yahoo": ["com", "co.id"], "gmail": ["com"], ...}
+    suffixes = {}
+    for domain in known:
+        label, _, suffix = domain.partition(".")
+        suffixes.setdefault(label, []).append(suffix)
+    return suffixes
+
+def _unique_best(matches: list):
+    # Kandidat terdekat, atau None jika tidak ada / dua kandidat sama dekatnya
+    matches = sorted(matches)
+    if not matches or (len(matches) > 1 and matches[0][0] == matches[1][0]):
+        return None
+    return matches[0][1]
+
+@lru_cache(maxsize=100_000)
+def _correct_domain(domain: str, known: tuple, max_distance: int) -> str:
+    if domain in known:
+        return domain
+    label, _, suffix = domain.partition(".")
+    tree = _label_trees(known).get(suffix)
+    if tree is not None:
+        # Typo di label: Levenshtein menghitung pertukaran sebagai 2, cari sampai max_distance + 1 lalu saring.
+        # Huruf pertama harus sama ("cloud" bukan typo "icloud"); lihat DOMAIN_MIN_LABEL untuk label pendek.
+        short = len(label) < DOMAIN_MIN_LABEL
+        best = _unique_best([
+            (1 if d == 2 else d, word)
+            for d, word in bk_search(tree, label, max_distance + 1)
+            if word[0] == label[0]
+            and (not short or len(word) != len(label))
+            and (d <= max_distance or (not short and _is_transposition(label, word)))
+        ])
+        return domain if best is None else f"{best}.{suffix}"
+    # Typo di sufiks ("gmail.co", "yahoo.co.idd"): hanya jika labelnya persis dikenal
+    best = _unique_best([
+        (d, known_suffix)
+        for known_suffix in _label_suffixes(known).get(label, [])
+        if (d := levenshtein(suffix, known_suffix)) <= max_distance
+    ])
+    return domain if best is None else f"{label}.{best}"
+
+def correct_domain(domain: str) -> str:
+    """Koreksi typo label atau sufiks domain ke KNOWN_EMAIL_DOMAINS terdekat (BK-tree, hasil per domain di-memo)."""
+    return _correct_domain(domain, tuple(KNOWN_EMAIL_DOMAINS), DOMAIN_MAX_DISTANCE)
+
+def clean_email(email, correct_domains: bool = False):
     if pd.isna(email):
         return None
     s = str(email).strip().lower()
@@ -58,11 +189,96 @@ def clean_email(email):
         return None
     if domain in _COMMON_DOMAINS:
         domain = _COMMON_DOMAINS[domain]
+    if correct_domains:
+        domain = correct_domain(domain)
     s = f"{username}@{domain}"
     if _EMAIL_RE.fullmatch(s):
         return s
     return None
 
+def _normalize_email_values(s: pd.Series, correct_domains: bool = False) -> pd.Series:
+    s = s.astype(str).str.strip().str.lower().str.replace(r"\s+", "", regex=True)
+    parts = s.str.partition("@")
+    domain = parts[2].map(lambda d: _COMMON_DOMAINS.get(d, d))
+    if correct_domains:
+        # Koreksi typo sekali per domain unik, bukan per alamat
+        domain = map_unique(domain, lambda u: u.map(correct_domain))
+    email = parts[0] + "@" + domain
+    # _EMAIL_RE mewajibkan "@", jadi baris tanpa "@" otomatis gagal di sini
+    valid = parts[1].eq("@") & email.str.fullmatch(_EMAIL_RE.pattern)
+    return email.where(valid.to_numpy(dtype=bool), None)
+
+def normalize_emails(s: pd.Series, cache: bool = False, correct_domains: bool = False) -> pd.Series:
+    """
+    Versi kolom dari clean_email: hasil identik, tetapi hanya nilai unik yang diproses (operasi string vektor).
+    cache=True           : lihat normalize_phones.
+    correct_domains=True : typo domain dikoreksi ke KNOWN_EMAIL_DOMAINS (lihat correct_domain).
+    """
+    func = lambda u: _normalize_email_values(u, correct_domains)
+    if not cache:
+        return map_unique(s, func)
+    if correct_domains:
+        # Jenis cache terpisah: berganti opsi tidak mengosongkan cache yang lain
+        kind = "email_corrected"
+        version = _rules_version(
+            sorted(_COMMON_DOMAINS.items()), _EMAIL_RE.pattern,
+            tuple(KNOWN_EMAIL_DOMAINS), DOMAIN_MAX_DISTANCE, DOMAIN_MIN_LABEL, "label-or-suffix",
+        )
+    else:
+        kind = "email"
+        version = _rules_version(sorted(_COMMON_DOMAINS.items()), _EMAIL_RE.pattern)
+    return map_unique(s, lambda u: cached_map(kind, version, u, func))
+
+# --- Resolusi identitas customer lintas email / phone ---
+def _customer_key_id(key: str) -> str:
+    return "C" + hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+
+def resolve_customer_ids(email: pd.Series, phone: pd.Series) -> pd.Series:
+    """
+    Customer ID per baris dari email & phone yang SUDAH dinormalisasi.
+    Baris yang berbagi email atau phone (langsung maupun berantai) mendapat ID yang sama
+    (union-find atas kode integer email & phone). ID = hash kunci terkecil dalam komponen
+    (email didahulukan daripada phone), sehingga stabil antar upload selama kelompoknya sama.
+    Baris tanpa email & phone -> None.
+    """
+    e_codes, e_uniques = pd.factorize(email)
+    p_codes, p_uniques = pd.factorize(phone)
+    n_email = len(e_uniques)
+
+    # Node 0..n_email-1 = email, sisanya = phone; edge = pasangan email-phone pada baris yang sama
+    both = (e_codes >= 0) & (p_codes >= 0)
+    labels = connected_components(e_codes[both], p_codes[both] + n_email, n_email + len(p_uniques))
+
+    keys = np.concatenate([
+        ("e:" + pd.Index(e_uniques, dtype=object).astype(str)).to_numpy(dtype=object),
+        ("p:" + pd.Index(p_uniques, dtype=object).astype(str)).to_numpy(dtype=object),
+    ])
+    # Kunci kanonik komponen = kunci dengan urutan terkecil
+    order = np.argsort(keys, kind="stable")
+    rank = np.empty(len(keys), dtype=np.int64)
+    rank[order] = np.arange(len(keys))
+    best = np.full(len(keys), len(keys), dtype=np.int64)
+    np.minimum.at(best, labels, rank)
+    roots = np.unique(labels)
+    sorted_keys = keys[np.argsort(keys, kind="stable")]
+    root_ids = np.empty(len(keys), dtype=object)
+    root_ids[roots] = [_customer_key_id(k) for k in sorted_keys[best[roots]]]
+
+    node = np.where(e_codes >= 0, e_codes, np.where(p_codes >= 0, p_codes + n_email, -1))
+    ids = np.full(len(node), None, dtype=object)
+    has_node = node >= 0
+    ids[has_node] = root_ids[labels[node[has_node]]]
+    return pd.Series(ids, index=email.index, name="Customer ID")
+
+def add_customer_ids(df: pd.DataFrame, contact_cache: bool = False) -> pd.DataFrame:
+    """Tambah kolom "Customer ID" (lihat resolve_customer_ids) ke data transaksi; kontak asli tidak diubah."""
+    df = df.copy(deep=False)
+    df["Customer ID"] = resolve_customer_ids(
+        normalize_emails(df["Attendee Email"], cache=contact_cache),
+        normalize_phones(df["Attendee Phone"], cache=contact_cache),
+    )
+    return df
+
 # --- Daftar unit yang diproses & mapping nama unit dari data produksi ---
 UNITS = [
     "Ancol",
@@ -88,78 +304,302 @@ promo_tickets = [
     "Tiket Free Kendaraan Listrik - Motor",
 ]
 
-def extract_unique_customers(
+def join_visit_dates(group_ids: np.ndarray, visits: pd.Series, n_groups: int, fmt: str = "%d/%m/%Y") -> np.ndarray:
+    """
+    Tanggal kunjungan unik & urut per grup digabung dengan ";" (grup tanpa tanggal -> ""),
+    untuk semua grup sekaligus: pasangan (grup, tanggal) di-dedup, tiap tanggal unik diformat sekali.
+    """
+    days = pd.to_datetime(visits, errors="coerce").dt.normalize().reset_index(drop=True)
+    pairs = (
+        pd.DataFrame({"group": group_ids, "day": days})
+          .dropna()
+          .drop_duplicates()
+          .sort_values(["group", "day"])
+    )
+    codes, uniques = pd.factorize(pairs["day"])
+    text = pd.DatetimeIndex(uniques).strftime(fmt).to_numpy(dtype=object)[codes]
+    joined = pd.Series(text).groupby(pairs["group"].to_numpy()).agg(";".join)
+
+    out = np.full(n_groups, "", dtype=object)
+    out[joined.index.to_numpy()] = joined.to_numpy()
+    return out
+
+def customer_rows(
     df: pd.DataFrame,
     unit_col: str = "Ticket Group",
     ticket_col: str = "Ticket Detail",
     visit_col: str = "Tgl Kunjungan",
-    visit_fmt: str = "%d/%m/%Y",
-):
+    contact_cache: bool = False,
+    correct_domains: bool = False,
+) -> tuple[pd.DataFrame, np.ndarray]:
     """
-    Menghasilkan dict {unit: DataFrame[Attendee Name, Attendee Email, Attendee Phone, Tgl Kunjungan (Semua)]}
-    - Membersihkan email & phone
-    - Mengabaikan ticket promosi
-    - Menggabungkan tanggal kunjungan (unik & urut) per (email, phone)
+    Baris customer yang siap dikelompokkan (dipakai ekstraksi & registry customer):
+    unit dikenal, bukan tiket promosi, kontak dinormalisasi, minimal email atau phone ada.
+    correct_domains=True : typo domain email dikoreksi (lihat normalize_emails)
+
+    Return: (rows, present)
+    - rows    : [Attendee Name, Attendee Email, Attendee Phone, visit_col, "_unit" (posisi di UNITS)]
+    - present : kode unit yang muncul di data (sebelum filter promo / kontak)
     """
+    # Normalisasi nama unit jika perlu
+    units = df[unit_col]
+    if isinstance(units.dtype, pd.CategoricalDtype):
+        # cukup petakan kategori, bukan setiap baris
+        units = units.map(lambda u: UNIT_MAP.get(u, u))
+    else:
+        units = units.replace(UNIT_MAP)
 
-    df = df.copy()
+    # Kode unit = posisi di UNITS (-1 jika bukan unit yang diproses)
+    unit_code = pd.Categorical(units, categories=UNITS).codes
+    present = np.unique(unit_code[unit_code >= 0])
 
-    # Normalisasi nama unit jika perlu
-    if unit_col in df.columns:
-        df[unit_col] = df[unit_col].replace(UNIT_MAP)
+    # Satu filter untuk semua unit: unit dikenal & bukan tiket promosi
+    keep = (unit_code >= 0) & ~df[ticket_col].isin(promo_tickets).to_numpy(dtype=bool)
+    sub = df.loc[keep, ["Attendee Name", "Attendee Email", "Attendee Phone", visit_col]]
+    sub["_unit"] = unit_code[keep]
 
     # Bersihkan kontak
-    if "Attendee Email" in df.columns:
-        df["Attendee Email"] = df["Attendee Email"].apply(clean_email)
-    if "Attendee Phone" in df.columns:
-        df["Attendee Phone"] = df["Attendee Phone"].apply(clean_phone)
+    sub["Attendee Email"] = normalize_emails(
+        sub["Attendee Email"], cache=contact_cache, correct_domains=correct_domains
+    )
+    sub["Attendee Phone"] = normalize_phones(sub["Attendee Phone"], cache=contact_cache)
 
     # Pastikan kolom tanggal
-    if visit_col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[visit_col]):
-        df[visit_col] = pd.to_datetime(df[visit_col], errors="coerce")
+    if not pd.api.types.is_datetime64_any_dtype(sub[visit_col]):
+        sub[visit_col] = pd.to_datetime(sub[visit_col], errors="coerce")
 
-    def _join_dates(s: pd.Series, fmt: str) -> str:
-        dates = pd.to_datetime(s, errors="coerce").dropna().dt.date
-        if len(dates) == 0:
-            return ""
-        dates = sorted(set(dates))
-        return ";".join(d.strftime(fmt) for d in dates)
+    # Buang baris tanpa kedua kontak (lebih longgar: minimal salah satu ada → gunakan how="all")
+    sub = sub.dropna(subset=["Attendee Email", "Attendee Phone"], how="all")
+    return sub, present
+
+def _group_customers(sub: pd.DataFrame, keys: list, visit_col: str, visit_fmt: str) -> pd.DataFrame | None:
+    """
+    Satu sort & satu groupby untuk semua unit: gabungkan tanggal kunjungan, ambil nama terakhir.
+    Return: satu baris per grup (kolom keys + kontak + "Tgl Kunjungan (Semua)"), None jika sub kosong.
+    """
+    if sub.empty:
+        return None
+    contact_cols = ["Attendee Name", "Attendee Email", "Attendee Phone"]
+    sub = sub.sort_values(visit_col, kind="stable")
+    groups = sub.groupby(keys, dropna=False)
+    grouped = groups[[c for c in contact_cols if c not in keys]].last().reset_index()
+    grouped["Tgl Kunjungan (Semua)"] = join_visit_dates(
+        groups.ngroup().to_numpy(), sub[visit_col], len(grouped), visit_fmt
+    )
+    return grouped
+
+# --- Mode out-of-core: baris input diproses per potongan & dipartisi ke disk per kunci customer ---
+OUT_OF_CORE_CHUNK_ROWS = 250_000
+OUT_OF_CORE_PARTITIONS = 16
+# Ukuran data minimum agar halaman memakai mode out-of-core
+OUT_OF_CORE_MIN_ROWS = 2_000_000
+
+def _customer_chunks(
+    df, unit_col, ticket_col, visit_col, contact_cache, correct_domains, chunk_rows=OUT_OF_CORE_CHUNK_ROWS
+):
+    """customer_rows per potongan baris df (urutan asal dipertahankan): yield (rows, present)."""
+    for start in range(0, len(df), chunk_rows):
+        yield customer_rows(
+            df.iloc[start:start + chunk_rows], unit_col, ticket_col, visit_col, contact_cache, correct_domains
+        )
+
+def _partition_schema(visit_col: str, resolve_identity: bool) -> pa.Schema:
+    # Skema tetap: potongan yang kolomnya kosong semua tidak boleh mengubah tipe file partisi
+    fields = [
+        ("Attendee Name", pa.string()), ("Attendee Email", pa.string()), ("Attendee Phone", pa.string()),
+        (visit_col, pa.timestamp("ns")), ("_unit", pa.int8()),
+    ]
+    if resolve_identity:
+        fields.append(("Customer ID", pa.string()))
+    return pa.schema(fields)
+
+def _group_partition(args) -> pd.DataFrame | None:
+    path, keys, visit_col, visit_fmt, dtypes = args
+    sub = pq.read_table(path).to_pandas().astype(dtypes)
+    return _group_customers(sub, keys, visit_col, visit_fmt)
+
+def _group_out_of_core(
+    df, keys, unit_col, ticket_col, visit_col, visit_fmt, contact_cache, correct_domains, resolve_identity, workers
+):
+    """
+    Ekstraksi per partisi hash: baris dinormalisasi per potongan lalu ditulis ke OUT_OF_CORE_PARTITIONS
+    file Parquet sementara menurut hash kunci customer (tanpa unit), sehingga satu grup selalu berada
+    di satu partisi. Urutan baris asal terjaga di tiap partisi, jadi sort stabil & "nilai terakhir"
+    per partisi sama dengan mode in-memory. Hasil partisi digabung & diurutkan ulang sesuai groupby.
+
+    resolve_identity: Customer ID butuh semua pasangan (email, phone) unik lebih dulu, jadi potongan
+    ternormalisasi disimpan dulu ke disk; yang ditahan di memori hanya pasangan kontak unik.
+
+    Return: (grouped | None, present, empty)
+    """
+    group_cols = keys[1:]
+    present, empty = [], None
+    with tempfile.TemporaryDirectory(prefix="customers_") as tmp_dir:
+        schema = _partition_schema(visit_col, resolve_identity)
+
+        def to_table(sub):
+            return pa.Table.from_pandas(sub, schema=schema, preserve_index=False)
+
+        def chunks():
+            nonlocal empty
+            for sub, chunk_present in _customer_chunks(
+                df, unit_col, ticket_col, visit_col, contact_cache, correct_domains
+            ):
+                present.append(chunk_present)
+                if empty is None:
+                    empty = sub.iloc[0:0]
+                yield sub
+
+        if resolve_identity:
+            # Tahap 1: simpan potongan ternormalisasi & kumpulkan pasangan kontak unik
+            staged, pairs = [], []
+            contact_schema = pa.schema([f for f in schema if f.name != "Customer ID"])
+            for i, sub in enumerate(chunks()):
+                path = os.path.join(tmp_dir, f"stage_{i}.parquet")
+                pq.write_table(pa.Table.from_pandas(sub, schema=contact_schema, preserve_index=False), path)
+                staged.append(path)
+                pairs.append(sub[["Attendee Email", "Attendee Phone"]].drop_duplicates())
+            if pairs:
+                pairs = pd.concat(pairs).drop_duplicates()
+                pairs["Customer ID"] = resolve_customer_ids(pairs["Attendee Email"], pairs["Attendee Phone"])
+
+            def rows():
+                for path in staged:
+                    sub = pq.read_table(path).to_pandas().astype(empty.dtypes.to_dict())
+                    ids = sub[["Attendee Email", "Attendee Phone"]].merge(pairs, how="left")["Customer ID"]
+                    yield sub.assign(**{"Customer ID": ids.to_numpy()})
+        else:
+            rows = chunks
+
+        # Tahap 2: tulis baris ke partisi menurut hash kunci grup
+        writers = {}
+        dtypes = None
+        try:
+            for sub in rows():
+                dtypes = dtypes or sub.dtypes.to_dict()
+                part = pd.util.hash_pandas_object(sub[group_cols], index=False).to_numpy() % OUT_OF_CORE_PARTITIONS
+                order = np.argsort(part, kind="stable")
+                ids, starts = np.unique(part[order], return_index=True)
+                for p, rows_p in zip(ids, np.split(order, starts[1:])):
+                    if p not in writers:
+                        writers[p] = pq.ParquetWriter(os.path.join(tmp_dir, f"part_{p}.parquet"), schema)
+                    writers[p].write_table(to_table(sub.iloc[rows_p]))
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        tasks = [
+            (os.path.join(tmp_dir, f"part_{p}.parquet"), keys, visit_col, visit_fmt, dtypes)
+            for p in sorted(writers)
+        ]
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+                results = list(pool.map(_group_partition, tasks))
+        else:
+            results = [_group_partition(task) for task in tasks]
+
+    if empty is None:
+        sub, _ = customer_rows(df.iloc[0:0], unit_col, ticket_col, visit_col, contact_cache, correct_domains)
+        empty = sub.iloc[0:0]
+    present = np.unique(np.concatenate(present)) if present else np.array([], dtype=np.int8)
+
+    results = [r for r in results if r is not None]
+    if not results:
+        return None, present, empty
+    # Urutan sama dengan groupby in-memory: per kunci, nilai kosong di akhir
+    grouped = (
+        pd.concat(results, ignore_index=True)
+          .sort_values(keys, kind="stable", na_position="last")
+          .reset_index(drop=True)
+    )
+    return grouped, present, empty
+
+def extract_unique_customers(
+    df: pd.DataFrame,
+    unit_col: str = "Ticket Group",
+    ticket_col: str = "Ticket Detail",
+    visit_col: str = "Tgl Kunjungan",
+    visit_fmt: str = "%d/%m/%Y",
+    contact_cache: bool = False,
+    resolve_identity: bool = False,
+    out_of_core: bool = False,
+    correct_domains: bool = False,
+    workers: int = 1,
+):
+    """
+    Menghasilkan dict {unit: DataFrame[Attendee Name, Attendee Email, Attendee Phone, Tgl Kunjungan (Semua)]}
+    - Membersihkan email & phone
+    - Mengabaikan ticket promosi
+    - Menggabungkan tanggal kunjungan (unik & urut) per (email, phone)
+    contact_cache=True : hasil normalisasi kontak diambil/disimpan di cache disk
+    correct_domains=True : typo domain email dikoreksi ke KNOWN_EMAIL_DOMAINS (lihat correct_domain)
+    resolve_identity=True : grup per "Customer ID" (lihat resolve_customer_ids) alih-alih pasangan
+                            (email, phone); email/phone/nama = nilai terakhir yang tidak kosong
+    out_of_core=True : baris dipartisi ke disk & dikelompokkan per partisi (hasil identik, memori
+                       puncak ~ ukuran partisi); workers > 1 memproses partisi paralel
+    """
 
     results = {}
     if unit_col not in df.columns:
         return results  # tidak ada kolom unit
 
-    unique_units = set(df[unit_col].dropna().unique().tolist())
-    for unit in UNITS:
-        if unit not in unique_units:
-            continue
+    # Kunci grup customer: pasangan kontak persis, atau ID hasil resolusi identitas lintas unit
+    contact_cols = ["Attendee Name", "Attendee Email", "Attendee Phone"]
+    out_cols = contact_cols + ["Tgl Kunjungan (Semua)"]
+    if resolve_identity:
+        keys = ["_unit", "Customer ID"]
+        out_cols = ["Customer ID"] + out_cols
+    else:
+        keys = ["_unit", "Attendee Email", "Attendee Phone"]
 
-        # Filter baris untuk unit ini & bukan tiket promosi
-        sub = df[
-            (df[unit_col] == unit) &
-            (~df[ticket_col].isin(promo_tickets))
-        ][["Attendee Name", "Attendee Email", "Attendee Phone", visit_col]].copy()
+    if out_of_core:
+        grouped, present, empty = _group_out_of_core(
+            df, keys, unit_col, ticket_col, visit_col, visit_fmt, contact_cache, correct_domains,
+            resolve_identity, workers,
+        )
+    else:
+        sub, present = customer_rows(df, unit_col, ticket_col, visit_col, contact_cache, correct_domains)
+        if resolve_identity:
+            sub["Customer ID"] = resolve_customer_ids(sub["Attendee Email"], sub["Attendee Phone"])
+        grouped = _group_customers(sub, keys, visit_col, visit_fmt)
+        empty = sub.iloc[0:0]
+    parts = dict(iter(grouped.groupby("_unit", sort=False))) if grouped is not None else {}
 
-        # Buang baris tanpa kedua kontak (lebih longgar: minimal salah satu ada → gunakan how="all")
-        sub = sub.dropna(subset=["Attendee Email", "Attendee Phone"], how="all")
+    # Unit tanpa customer tetap punya kolom & tipe yang sama dengan unit lain
+    empty = empty[contact_cols].assign(**{
+        col: pd.Series(dtype=object) for col in out_cols if col not in contact_cols
+    })[out_cols]
 
-        if sub.empty:
-            results[unit] = sub
+    # Pecah hasil per unit (urutan mengikuti UNITS)
+    for code in present:
+        unit = UNITS[code]
+        if code not in parts:
+            results[unit] = empty.copy()
             continue
+        results[unit] = parts[code][out_cols].reset_index(drop=True)
 
-        # Group: gabungkan tanggal kunjungan, ambil nama terakhir
-        grouped = (
-            sub.sort_values(visit_col)
-               .groupby(["Attendee Email", "Attendee Phone"], as_index=False, dropna=False)
-               .agg({
-                   "Attendee Name": "last",
-                   visit_col: lambda s: _join_dates(s, visit_fmt),
-               })
-        )
+    return results
 
-        grouped = grouped.rename(columns={visit_col: "Tgl Kunjungan (Semua)"})
-        grouped = grouped[["Attendee Name", "Attendee Email", "Attendee Phone", "Tgl Kunjungan (Semua)"]]
+# Cache hasil ekstraksi per halaman (level modul = level proses Streamlit): rerun karena download,
+# expander, atau kembali ke rentang tanggal sebelumnya tidak mengekstrak ulang
+EXTRACTION_CACHE_SIZE = 8
+_extraction_cache = LRUCache(maxsize=EXTRACTION_CACHE_SIZE)
+_extraction_lock = threading.Lock()
 
-        results[unit] = grouped.reset_index(drop=True)
+def cached_extraction(key, build) -> dict:
+    """
+    build() -> {unit: DataFrame} dijalankan sekali per key, mis.
+    (file_fingerprint upload, rentang Tgl Kunjungan, opsi ekstraksi); berikutnya diambil dari cache (LRU).
+    """
+    with _extraction_lock:
+        customers = _extraction_cache.get(key)
+    if customers is None:
+        customers = build()
+        with _extraction_lock:
+            _extraction_cache[key] = customers
+    # Salinan dangkal per unit: halaman boleh menambah kolom tanpa merusak isi cache
+    return {unit: df_unit.copy(deep=False) for unit, df_unit in customers.items()}
 
-    return results
+def clear_extraction_cache():
+    with _extraction_lock:
+        _extraction_cache.clear()
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.customer_extraction import UNITS, customer_rows
+from utils.data_cleaning import map_unique
+
+# Registry customer lintas upload (bisa diganti lewat env CUSTOMER_REGISTRY_PATH)
+REGISTRY_PATH = os.environ.get("CUSTOMER_REGISTRY_PATH", os.path.join("data", "customer_registry.sqlite"))
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS contacts ("
+        " key TEXT PRIMARY KEY, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL,"
+        " units INTEGER NOT NULL, visits INTEGER NOT NULL)"
+    )
+    # Hari kunjungan per kontak (unik): visits = jumlah baris di sini, sehingga export yang
+    # rentangnya tumpang tindih tidak menghitung hari yang sama dua kali
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS visit_days ("
+        " key TEXT NOT NULL, day TEXT NOT NULL, PRIMARY KEY (key, day)) WITHOUT ROWID"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS uploads (source_id TEXT PRIMARY KEY, ingested_at REAL NOT NULL)")
+    return conn
+
+def _hash_values(values: pd.Series, prefix: str) -> pd.Series:
+    return values.map(lambda v: hashlib.blake2b((prefix + v).encode(), digest_size=16).hexdigest())
+
+def contact_keys(email: pd.Series, phone: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """Kunci registry dari email & phone yang SUDAH dinormalisasi (hash, kontak asli tidak disimpan)."""
+    return map_unique(email, lambda u: _hash_values(u, "e:")), map_unique(phone, lambda u: _hash_values(u, "p:"))
+
+# Unit yang pernah dikunjungi disimpan sebagai bitmask posisi di UNITS:
+# unit baru ditambahkan di akhir UNITS, urutan lama jangan diubah
+def units_from_mask(mask: int) -> list:
+    return [unit for i, unit in enumerate(UNITS) if mask >> i & 1]
+
+def update_registry(
+    df: pd.DataFrame,
+    source_id: str | None = None,
+    path: str | None = None,
+    contact_cache: bool = False,
+) -> dict:
+    """
+    Tambahkan kunjungan dari data transaksi (output ETL) ke registry secara inkremental.
+    Tiap email & phone menjadi satu entri: first_seen, last_seen, bitmask unit, jumlah hari kunjungan.
+    Semua kolom idempoten: upload yang rentangnya tumpang tindih (mis. Januari lalu Januari-Maret)
+    tidak menggandakan hari kunjungan.
+    source_id (mis. file_fingerprint upload): upload yang sama tidak dihitung dua kali.
+
+    Return: {"contacts": kontak di upload ini, "new": kontak yang belum pernah ada, "skipped": bool}
+    """
+    path = path or REGISTRY_PATH
+    sub, _ = customer_rows(df, contact_cache=contact_cache)
+    sub = sub.dropna(subset=["Tgl Kunjungan"])
+    email_key, phone_key = contact_keys(sub["Attendee Email"], sub["Attendee Phone"])
+
+    day = sub["Tgl Kunjungan"].dt.strftime("%Y-%m-%d").to_numpy()
+    unit_bit = np.left_shift(1, sub["_unit"].to_numpy().astype(np.int64))
+    visits = pd.DataFrame({
+        "key": np.concatenate([email_key.to_numpy(), phone_key.to_numpy()]),
+        "day": np.concatenate([day, day]),
+        "unit_bit": np.concatenate([unit_bit, unit_bit]),
+    }).dropna(subset=["key"])
+
+    # Agregat per kontak untuk upload ini; visits dihitung ulang dari visit_days setelah disimpan
+    per_key = visits.groupby("key").agg(first_seen=("day", "min"), last_seen=("day", "max"))
+    per_key["units"] = visits.drop_duplicates(["key", "unit_bit"]).groupby("key")["unit_bit"].sum()
+    rows = list(per_key[["first_seen", "last_seen", "units"]].itertuples(name=None))
+    days = visits[["key", "day"]].drop_duplicates()
+
+    conn = _connect(path)
+    try:
+        with conn:
+            if source_id is not None:
+                seen = conn.execute("SELECT 1 FROM uploads WHERE source_id = ?", (source_id,)).fetchone()
+                if seen:
+                    return {"contacts": len(rows), "new": 0, "skipped": True}
+                conn.execute("INSERT INTO uploads (source_id, ingested_at) VALUES (?, ?)", (source_id, time.time()))
+
+            before = conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO contacts (key, first_seen, last_seen, units, visits) VALUES (?, ?, ?, ?, 0)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                " first_seen = MIN(first_seen, excluded.first_seen),"
+                " last_seen = MAX(last_seen, excluded.last_seen),"
+                " units = units | excluded.units",
+                [(key, first, last, int(units)) for key, first, last, units in rows],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO visit_days (key, day) VALUES (?, ?)", days.itertuples(index=False, name=None)
+            )
+            conn.execute("CREATE TEMP TABLE touched (key TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO touched (key) VALUES (?)", ((key,) for key, *_ in rows))
+            conn.execute(
+                "UPDATE contacts SET visits = (SELECT COUNT(*) FROM visit_days v WHERE v.key = contacts.key)"
+                " WHERE key IN (SELECT key FROM touched)"
+            )
+            after = conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+    finally:
+        conn.close()
+    return {"contacts": len(rows), "new": after - before, "skipped": False}
+
+def lookup_registry(keys, path: str | None = None) -> pd.DataFrame:
+    """Entri registry untuk kunci yang diberikan (lookup indeks primary key), index = key."""
+    path = path or REGISTRY_PATH
+    keys = pd.unique(pd.Series(list(keys), dtype=object).dropna())
+    conn = _connect(path)
+    try:
+        conn.execute("CREATE TEMP TABLE lookup (key TEXT PRIMARY KEY)")
+        conn.executemany("INSERT INTO lookup (key) VALUES (?)", ((k,) for k in keys))
+        found = pd.read_sql_query(
+            "SELECT c.key, c.first_seen, c.last_seen, c.units, c.visits"
+            " FROM lookup l JOIN contacts c ON c.key = l.key",
+            conn,
+        )
+    finally:
+        conn.close()
+    return found.set_index("key")
+
+def customer_status(customers: pd.DataFrame, since, path: str | None = None) -> pd.Series:
+    """
+    "Baru" / "Kembali" per baris hasil ekstraksi (email & phone sudah dinormalisasi).
+    Kembali = email atau phone-nya sudah tercatat di registry sebelum tanggal `since`.
+    """
+    email_key, phone_key = contact_keys(customers["Attendee Email"], customers["Attendee Phone"])
+    found = lookup_registry(pd.concat([email_key, phone_key]), path)
+    since = pd.Timestamp(since).strftime("%Y-%m-%d")
+    first_seen = found["first_seen"]
+    returning = (email_key.map(first_seen).lt(since) | phone_key.map(first_seen).lt(since)).to_numpy()
+    return pd.Series(np.where(returning, "Kembali", "Baru"), index=customers.index, name="Status")
@@ -5,34 +5,34 @@ from utils.data_cleaning import convert_to_datetime
 from utils.preprocessing import convert_numeric
 from utils.helpers import map_columns
 
+# Naikkan setiap kali output load_and_clean_data berubah (invalidasi cache ETL)
+ETL_VERSION = 2
+
 QUESTION_MAP = {
     r"Group_Secara keseluruhan.*puaskah Anda terhadap pengalaman.*": "CSI",
     r"Numeric_Secara keseluruhan.*puaskah Anda terhadap pengalaman.*": "Numeric_CSI",
     r"Numeric_Dari Pengalaman Anda.*datang kembali.*": "Numeric_Will Return",
 }
 
+SURVEY_COLUMNS = [
+    "What is the primary reason for your score?",
+    "Tags_What is the primary reason for your score?",
+    "Sentiment_What is the primary reason for your score?",
+    "Sync On-DateTime",
+    "Camp Sent On Date Time",
+    "Name",
+    "Email",
+    "Phone Number",
+    "Campaign Id",
+]
+
 def load_and_clean_data(file: str) -> pd.DataFrame:
 
-    df = load_csv(file)
+    # Hanya kolom survey yang dipakai (nama persis + header pertanyaan di QUESTION_MAP) yang di-parse
+    df = load_csv(file, columns=SURVEY_COLUMNS, column_patterns=list(QUESTION_MAP))
 
     df = map_columns(df, QUESTION_MAP)
 
-    cols_to_use = [
-        "CSI",
-        "Numeric_CSI",
-        "What is the primary reason for your score?",
-        "Tags_What is the primary reason for your score?",
-        "Sentiment_What is the primary reason for your score?",
-        "Numeric_Will Return",
-        "Sync On-DateTime",
-        "Camp Sent On Date Time",
-        "Name",
-        "Email",
-        "Phone Number",
-        "Campaign Id",
-
-    ]
-
     df = df.rename(columns={
         "What is the primary reason for your score?": "Primary Reason",
         "Tags_What is the primary reason for your score?": "Tags_Primary Reason",
@@ -1,61 +1,191 @@
+import json
+import multiprocessing as mp
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import re
-from utils.data_loading import load_csv
-from utils.preprocessing import convert_numeric
+from utils.data_loading import iter_csv_batches, read_csv_arrow
+from modules.customer_extraction import normalize_emails, normalize_phones
+from utils.preprocessing import convert_numeric, apply_compact_schema
 from utils.data_cleaning import (
     clean_empty_rows, 
     drop_unused_columns, 
-    convert_to_datetime, 
-    split_multi_items, 
-    strip_and_explode
+    convert_to_datetime,
+    explode_multi_items,
+    first_date_value,
+    infer_date_format,
 )
 
-def load_and_clean_data(file: str) -> pd.DataFrame:
-    # 1. Load
-    df = load_csv(file)
-
-    # 2. Pilih hanya kolom yang akan digunakan
-    cols_to_use = [
-        "No Transaksi",
-        "Tgl Transaksi",
-        "Tgl Kunjungan",
-        "Attendee Name",
-        "Attendee Email",
-        "Attendee Phone",
-        "Status",
-        "Ticket Group",
-        "Ticket Detail",
-        "Ticket Purchased",
-        "Ticket Price",
-        "Total Ticket Purchase",
-        "Total Payment",
+# Naikkan setiap kali output load_and_clean_data berubah (invalidasi cache ETL)
+ETL_VERSION = 6
+
+# Kolom export transaksi yang dipakai ETL
+TRANSACTION_COLUMNS = [
+    "No Transaksi",
+    "Tgl Transaksi",
+    "Tgl Kunjungan",
+    "Attendee Name",
+    "Attendee Email",
+    "Attendee Phone",
+    "Status",
+    "Ticket Group",
+    "Ticket Detail",
+    "Ticket Purchased",
+    "Ticket Price",
+    "Total Ticket Purchase",
+    "Total Payment",
+]
+
+# Skema eksplisit kolom export transaksi (dibaca sebagai string, dikonversi di tahap ETL)
+TRANSACTION_COLUMN_TYPES = {col: pa.string() for col in TRANSACTION_COLUMNS}
+
+DATE_COLUMNS = ["Tgl Transaksi", "Tgl Kunjungan"]
+
+# Mode paralel: jumlah proses default & ukuran minimum data agar overhead proses sepadan
+PARALLEL_WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_ROWS = 200_000
+
+# Upload di atas ukuran ini dibersihkan per chunk (stream_clean_data), CSV utuh tidak pernah dimuat
+# (jauh di bawah batas upload default Streamlit 200 MB)
+STREAM_MIN_BYTES = 32 << 20
+
+def _source_size(file) -> int:
+    if hasattr(file, "getbuffer"):
+        with file.getbuffer() as buf:
+            return buf.nbytes
+    if isinstance(file, (str, os.PathLike)):
+        return os.path.getsize(file)
+    return 0
+
+def load_and_clean_data(file: str, filters: list | None = None, workers: int = 1) -> pd.DataFrame:
+    """
+    filters : filter baris opsional yang diterapkan saat parsing CSV, mis.
+              [("Status", "in", ["Paid"]), ("Tgl Transaksi", "between", ("2025-01-01", "2025-01-31"))]
+    workers : > 1 untuk menjalankan langkah 2-8 paralel di beberapa proses (hasil identik dengan serial)
+    File >= STREAM_MIN_BYTES diproses per chunk lewat stream_clean_data dengan hasil yang sama.
+    """
+    if _source_size(file) >= STREAM_MIN_BYTES:
+        return clean_table_to_frame(stream_clean_data(file, filters=filters, workers=workers))
+
+    # 1. Load hanya kolom yang akan digunakan (parser pyarrow multithread, skema eksplisit)
+    table = read_csv_arrow(
+        file,
+        column_types=TRANSACTION_COLUMN_TYPES,
+        columns=TRANSACTION_COLUMNS,
+        filters=filters,
+    )
+    if workers > 1 and table.num_rows >= PARALLEL_MIN_ROWS:
+        df = _clean_parallel(table, workers)
+    else:
+        df = clean_frame(table.to_pandas(types_mapper=pd.ArrowDtype))
+
+    # 9. Tipe ringkas: kategori untuk kolom berulang, integer kecil untuk jumlah, int64 untuk Rupiah
+    return compact_transactions(df)
+
+def _string_mapper(dtype: pa.DataType):
+    # kolom teks tetap ber-dtype Arrow seperti output ETL
+    if pa.types.is_string(dtype) or pa.types.is_large_string(dtype):
+        return pd.ArrowDtype(dtype)
+    return None
+
+def clean_table_to_frame(table: pa.Table) -> pd.DataFrame:
+    """Tabel ber-skema CLEAN_SCHEMA (stream_clean_data / store Parquet) -> DataFrame bertipe ringkas seperti load_and_clean_data."""
+    df = table.to_pandas(types_mapper=_string_mapper)
+    # kolom multi-item hasil explode bertipe object di load_and_clean_data; samakan sebelum jadi kategori
+    for col in ["Ticket Group", "Ticket Detail"]:
+        df[col] = table.column(col).to_pandas()
+    metadata = table.schema.metadata or {}
+    if b"etl_report" in metadata:
+        df.attrs.update(json.loads(metadata[b"etl_report"]))
+    return compact_transactions(df)
+
+def compact_transactions(df: pd.DataFrame) -> pd.DataFrame:
+    """Terapkan skema tipe ringkas hasil ETL; laporan memori disimpan di df.attrs."""
+    df, memory_report = apply_compact_schema(
+        df,
+        categorical_cols=["Ticket Group", "Ticket Detail", "Status"],
+        count_cols=["Ticket Purchased", "Total Ticket Purchase", "Total Ticket Purchased Transaction"],
+        amount_cols=["Ticket Price", "Total Payment", "Total Payment Transaction"],
+    )
+    df.attrs.update(memory_report)
+    return df
+
+def _date_formats(table: pa.Table) -> dict:
+    """Kunci format tiap kolom tanggal dari nilai non-kosong pertama (sama dengan mode serial)."""
+    formats = {}
+    for col in DATE_COLUMNS:
+        values = table.column(col).drop_null() if col in table.column_names else []
+        value = first_date_value(v.as_py() for v in values)
+        if value is not None:
+            formats[col] = infer_date_format(value)
+    return formats
+
+def _merge_reports(parts: list) -> dict:
+    """Gabungkan laporan clean_frame per chunk (df.attrs): baris mismatch & baris kosong yang dibuang."""
+    by_column = {}
+    for attrs in parts:
+        for col, n in attrs.get("rejected_by_column", {}).items():
+            by_column[col] = by_column.get(col, 0) + n
+    return {
+        "rejected_rows": sum(attrs.get("rejected_rows", 0) for attrs in parts),
+        "rejected_by_column": by_column,
+        "mismatched_item_rows": sum(attrs.get("mismatched_item_rows", 0) for attrs in parts),
+    }
+
+def _clean_piece(args) -> pd.DataFrame:
+    table, offset, date_formats = args
+    df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    # index global agar hasil gabungan sama persis dengan mode serial
+    df.index = pd.RangeIndex(offset, offset + len(df))
+    return clean_frame(df, date_formats)
+
+def _clean_parallel(table: pa.Table, workers: int) -> pd.DataFrame:
+    """
+    Potong tabel hasil parse (batas record sudah aman karena dipotong per baris, bukan per byte),
+    proses tiap potongan di process pool, lalu gabungkan sesuai urutan asal.
+    """
+    date_formats = _date_formats(table)
+    bounds = np.linspace(0, table.num_rows, workers + 1).astype(int)
+    pieces = [
+        (table.slice(start, stop - start), start, date_formats)
+        for start, stop in zip(bounds[:-1], bounds[1:])
     ]
-    df = df[cols_to_use]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        parts = list(pool.map(_clean_piece, pieces))
+
+    report = _merge_reports([part.attrs for part in parts])
+    df = pd.concat(parts)
+    df.attrs = report
+    return df
+
+def clean_frame(df: pd.DataFrame, date_formats: dict | None = None) -> pd.DataFrame:
+    """Langkah 2-8 ETL; hanya bergantung pada baris itu sendiri sehingga bisa dijalankan per chunk."""
+    # 2. Pastikan urutan kolom sesuai TRANSACTION_COLUMNS (error jika ada kolom yang hilang)
+    df = df[TRANSACTION_COLUMNS]
 
     # 3. Convert ke datetime
-    df = convert_to_datetime(df, ["Tgl Transaksi", "Tgl Kunjungan"])
+    df = convert_to_datetime(df, DATE_COLUMNS, formats=date_formats)
 
-    # 4. Hitung total per transaksi (sebelum explode)
+    # 4. Hitung total per transaksi (sebelum explode); tiap kolom item dipecah sekali untuk kedua total
     if "Ticket Purchased" in df.columns and "Ticket Price" in df.columns:
-        df["Total Payment Transaction"] = df.apply(
-            lambda x: sum(
-                pd.to_numeric(i, errors="coerce") * pd.to_numeric(p, errors="coerce")
-                for i, p in zip(str(x["Ticket Purchased"]).split(";"),
-                                str(x["Ticket Price"]).split(";"))
-            ),
-            axis=1,
-        )
-        df["Total Ticket Purchased Transaction"] = df["Ticket Purchased"].apply(
-            lambda x: sum(pd.to_numeric(i, errors="coerce") for i in str(x).split(";"))
-        )
-
-    # 5. Split multi-item kolom
+        qty = _flatten_items(df["Ticket Purchased"])
+        prc = _flatten_items(df["Ticket Price"])
+        df["Total Payment Transaction"] = _total_payment_per_row(qty, prc, df.index)
+        df["Total Ticket Purchased Transaction"] = _total_purchased_per_row(qty, df.index)
+
+    # 5. Bersihkan baris kosong (kolom multi-item dicek setelah dipecah); ringkasan tetap di df.attrs
     multi_item_cols = ["Ticket Group", "Ticket Purchased", "Ticket Detail", "Ticket Price"]
-    df = split_multi_items(df, multi_item_cols)
+    df = clean_empty_rows(df, subset=[c for c in df.columns if c not in multi_item_cols])
 
-    # 6. Bersihkan dan explode
-    df = clean_empty_rows(df)
-    df = strip_and_explode(df, multi_item_cols)
+    # 6. Split & explode multi-item kolom; baris dengan jumlah item tidak sama dipisahkan
+    df, mismatch = explode_multi_items(df, multi_item_cols)
+    df.attrs["mismatched_item_rows"] = len(mismatch)
 
     # 7. Konversi numerik
     df = convert_numeric(df, ["Ticket Purchased", "Ticket Price"])
@@ -67,6 +197,156 @@ def load_and_clean_data(file: str) -> pd.DataFrame:
 
     return df
 
+# Skema output ETL untuk sink streaming (tipe harus sama di semua chunk)
+CLEAN_SCHEMA = pa.schema([
+    ("No Transaksi", pa.string()),
+    ("Tgl Transaksi", pa.timestamp("ns")),
+    ("Tgl Kunjungan", pa.timestamp("ns")),
+    ("Attendee Name", pa.string()),
+    ("Attendee Email", pa.string()),
+    ("Attendee Phone", pa.string()),
+    ("Status", pa.string()),
+    ("Ticket Group", pa.string()),
+    ("Ticket Detail", pa.string()),
+    ("Ticket Purchased", pa.float64()),
+    ("Ticket Price", pa.float64()),
+    ("Total Ticket Purchase", pa.float64()),
+    ("Total Payment", pa.float64()),
+    ("Total Payment Transaction", pa.float64()),
+    ("Total Ticket Purchased Transaction", pa.float64()),
+])
+
+STREAM_BLOCK_SIZE = 16 << 20  # ~16 MB CSV per chunk
+
+def clean_batches(tables, workers: int = 1):
+    """
+    Jalankan clean_frame per chunk pa.Table secara berurutan (yield DataFrame, urutan asal tetap).
+    Format tanggal dikunci dari chunk pertama yang berisi nilai, index melanjutkan chunk sebelumnya.
+    workers > 1: chunk diproses di process pool, paling banyak 2 x workers chunk tertahan di memori.
+    """
+    def pieces():
+        date_formats, offset = {}, 0
+        for table in tables:
+            for col, fmt in _date_formats(table).items():
+                date_formats.setdefault(col, fmt)
+            yield table, offset, dict(date_formats)
+            offset += table.num_rows
+
+    if workers <= 1:
+        yield from map(_clean_piece, pieces())
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        pending = deque()
+        for piece in pieces():
+            pending.append(pool.submit(_clean_piece, piece))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def stream_clean_data(
+    file,
+    sink: str | None = None,
+    filters: list | None = None,
+    block_size: int = STREAM_BLOCK_SIZE,
+    workers: int = 1,
+):
+    """
+    Mode streaming untuk export yang lebih besar dari memori: CSV dibaca per chunk
+    (~block_size byte), tiap chunk melewati langkah ETL yang sama dengan load_and_clean_data,
+    lalu langsung ditulis ke sink sehingga memori puncak tetap ~1 chunk (~2 x workers chunk jika paralel).
+
+    sink=None      : hasil dikumpulkan sebagai pa.Table (string Arrow, jauh lebih ringkas dari object);
+                     clean_table_to_frame mengubahnya ke tipe ringkas untuk dashboard
+    sink="x.parquet": hasil ditulis bertahap ke file Parquet, return path tersebut
+
+    Kolom numerik disimpan sebagai float64 agar tipe konsisten antar chunk.
+    """
+    batches = iter_csv_batches(
+        file,
+        column_types=TRANSACTION_COLUMN_TYPES,
+        columns=TRANSACTION_COLUMNS,
+        filters=filters,
+        block_size=block_size,
+    )
+    chunks = (pa.Table.from_batches([batch]) for batch in batches)
+
+    writer = pq.ParquetWriter(sink, CLEAN_SCHEMA) if sink is not None else None
+    tables = []
+    reports = []
+    try:
+        for df in clean_batches(chunks, workers):
+            reports.append(df.attrs)
+            table = pa.Table.from_pandas(df, schema=CLEAN_SCHEMA, preserve_index=False)
+            if writer is not None:
+                writer.write_table(table)
+            else:
+                tables.append(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is not None:
+        return sink
+    result = pa.concat_tables(tables) if tables else CLEAN_SCHEMA.empty_table()
+    # laporan baris yang dibuang ikut di metadata skema (dibaca lagi oleh clean_table_to_frame)
+    return result.replace_schema_metadata({"etl_report": json.dumps(_merge_reports(reports))})
+
+
+def _flatten_items(s: pd.Series) -> pd.DataFrame:
+    """
+    Pecah kolom multi-item (";") menjadi tabel datar satu baris per item:
+    kolom "row" (posisi baris asal), "pos" (urutan item) dan "value" (numerik).
+    Nilai kosong / tidak valid menjadi NaN, sama seperti pd.to_numeric(errors="coerce").
+    Split dilakukan sekali di Arrow (split_pattern + list_flatten), tanpa str.split + explode.
+    """
+    try:
+        values = pa.array(s, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # kolom campuran (mis. angka hasil input manual): samakan dengan str() per nilai
+        values = pa.array(s.astype(str), type=pa.string())
+    lists = pc.split_pattern(values.fill_null(""), ";")
+    rows = pc.list_parent_indices(lists).to_numpy()
+    offsets = lists.offsets.to_numpy()
+    flat = pc.list_flatten(lists).to_numpy(zero_copy_only=False)
+    return pd.DataFrame({
+        "row": rows,
+        "pos": np.arange(len(rows)) - offsets[rows],
+        "value": pd.to_numeric(pd.Series(flat), errors="coerce").to_numpy(),
+    })
+
+def _sum_per_row(values: pd.Series, rows, n_rows: int) -> pd.Series:
+    # NaN ikut menular seperti sum() Python, bukan di-skip seperti groupby().sum()
+    sums = values.groupby(rows).sum()
+    has_nan = values.isna().groupby(rows).any()
+    if has_nan.any():
+        sums = sums.astype("float64")
+        sums[has_nan] = np.nan
+    return sums.reindex(range(n_rows))
+
+def _total_payment_per_row(qty: pd.DataFrame, prc: pd.DataFrame, index: pd.Index) -> pd.Series:
+    """
+    Sum(qty * harga) per baris; pasangan item dipotong ke list terpendek (seperti zip).
+    qty, prc : hasil _flatten_items kolom "Ticket Purchased" dan "Ticket Price"
+    """
+    n_rows = len(index)
+    n_pairs = np.minimum(
+        np.bincount(qty["row"], minlength=n_rows),
+        np.bincount(prc["row"], minlength=n_rows),
+    )
+    qty = qty[qty["pos"].to_numpy() < n_pairs[qty["row"].to_numpy()]]
+    prc = prc[prc["pos"].to_numpy() < n_pairs[prc["row"].to_numpy()]]
+
+    # Keduanya terurut (row, pos) sehingga bisa dikalikan per posisi
+    amount = pd.Series(qty["value"].to_numpy() * prc["value"].to_numpy())
+    totals = _sum_per_row(amount, qty["row"].to_numpy(), n_rows)
+    return pd.Series(totals.to_numpy(), index=index)
+
+def _total_purchased_per_row(qty: pd.DataFrame, index: pd.Index) -> pd.Series:
+    totals = _sum_per_row(qty["value"], qty["row"].to_numpy(), len(index))
+    return pd.Series(totals.to_numpy(), index=index)
+
 
 _VALID_PREFIXES = (
     "811","812","813","821","822","823","851","852","853","814","815","816",
@@ -152,8 +432,8 @@ def get_unique_customers(
     df = df.copy()
 
     # Bersihkan kontak
-    df["Attendee Email"] = df["Attendee Email"].apply(clean_email)
-    df["Attendee Phone"] = df["Attendee Phone"].apply(clean_phone)
+    df["Attendee Email"] = normalize_emails(df["Attendee Email"])
+    df["Attendee Phone"] = normalize_phones(df["Attendee Phone"])
 
     # Pastikan kolom tanggal ada & datetime
     if visit_col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[visit_col]):
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+# Kolom level transaksi (sekali per "No Transaksi") dan level item (sekali per tiket)
+TRANSACTION_COLS = [
+    "No Transaksi",
+    "Tgl Transaksi",
+    "Tgl Kunjungan",
+    "Attendee Name",
+    "Attendee Email",
+    "Attendee Phone",
+    "Status",
+    "Total Payment Transaction",
+    "Total Ticket Purchased Transaction",
+    "Customer ID",
+]
+ITEM_COLS = ["Ticket Group", "Ticket Detail", "Ticket Purchased", "Ticket Price"]
+
+# Kolom item turunan, dihitung ulang saat view dibentuk (tidak disimpan)
+DERIVED_ITEM_COLS = ["Total Payment", "Total Ticket Purchase"]
+
+# Urutan kolom default item_view, sama dengan output ETL (grid & download tidak berubah)
+VIEW_COLS = [
+    "No Transaksi",
+    "Tgl Transaksi",
+    "Tgl Kunjungan",
+    "Attendee Name",
+    "Attendee Email",
+    "Attendee Phone",
+    "Status",
+    "Ticket Group",
+    "Ticket Detail",
+    "Ticket Purchased",
+    "Ticket Price",
+    "Total Ticket Purchase",
+    "Total Payment",
+    "Total Payment Transaction",
+    "Total Ticket Purchased Transaction",
+    "Customer ID",
+]
+
+# Kolom yang dipakai chart dashboard (summary, trend, top 5, heatmap, total per unit)
+CHART_COLS = [
+    "Tgl Transaksi",
+    "Tgl Kunjungan",
+    "Ticket Group",
+    "Ticket Detail",
+    "Ticket Purchased",
+    "Total Ticket Purchase",
+    "Total Payment",
+]
+
+def _differs_from_first(df: pd.DataFrame, first_rows: np.ndarray) -> bool:
+    # True jika ada baris yang atribut transaksinya berbeda dari baris pertama "No Transaksi"-nya
+    for col in df.columns:
+        values = df[col].reset_index(drop=True)
+        ref = values.take(first_rows).reset_index(drop=True)
+        same = (values == ref).fillna(False).to_numpy(dtype=bool) | (values.isna() & ref.isna()).to_numpy()
+        if not same.all():
+            return True
+    return False
+
+def split_transactions(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Pecah output ETL (satu baris per item, kolom transaksi berulang) menjadi dua tabel:
+    - transactions : satu baris per "No Transaksi", index "txn_id" (0..n-1)
+    - items        : satu baris per item dengan "txn_id" int32, "Ticket Group"/"Ticket Detail"/"Ticket Price"
+                     sebagai kategori (dictionary-encoded) dan "Ticket Purchased"
+    "No Transaksi" yang dipakai ulang dengan atribut berbeda dipecah menjadi beberapa transaksi, sehingga
+    item_view mengembalikan baris yang sama dengan df. df.attrs ikut ke transactions.
+    """
+    txn_cols = [c for c in TRANSACTION_COLS if c in df.columns]
+    codes, _ = pd.factorize(df["No Transaksi"], use_na_sentinel=False)
+    _, first = np.unique(codes, return_index=True)
+
+    if _differs_from_first(df[txn_cols], first[codes]):
+        codes = df.groupby(txn_cols, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+        _, first = np.unique(codes, return_index=True)
+
+    transactions = df.iloc[first][txn_cols].reset_index(drop=True)
+    transactions.index.name = "txn_id"
+    transactions.attrs = dict(df.attrs)
+
+    items = pd.DataFrame({"txn_id": codes.astype(np.int32)})
+    for col in ITEM_COLS:
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy() if col == "Ticket Purchased" else df[col].astype("category").array
+        items[col] = values
+    return transactions, items
+
+def filter_model(
+    transactions: pd.DataFrame,
+    items: pd.DataFrame,
+    txn_mask=None,
+    item_mask=None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Subset kedua tabel sekaligus (txn_id tetap, tidak dinomori ulang):
+    - txn_mask  : boolean per baris transactions (mis. rentang "Tgl Transaksi")
+    - item_mask : boolean per baris items (mis. "Ticket Group" satu unit)
+    Transaksi yang tidak punya item tersisa ikut dibuang, sama seperti memfilter tabel item lalu split_transactions.
+    """
+    keep = np.ones(len(items), dtype=bool)
+    if item_mask is not None:
+        keep &= np.asarray(item_mask, dtype=bool)
+    if txn_mask is not None:
+        txn_keep = pd.Series(np.asarray(txn_mask, dtype=bool), index=transactions.index)
+        keep &= txn_keep.reindex(items["txn_id"].to_numpy(), fill_value=False).to_numpy()
+    items = items[keep]
+    transactions = transactions.loc[np.unique(items["txn_id"].to_numpy())]
+    return transactions, items
+
+def _decode_price(items: pd.DataFrame) -> pd.Series:
+    price = items["Ticket Price"]
+    return price.astype(price.cat.categories.dtype)
+
+def item_view(transactions: pd.DataFrame, items: pd.DataFrame, columns: list | None = None) -> pd.DataFrame:
+    """
+    Bentuk tabel level item (seperti output ETL) lewat join txn_id.
+    columns : hanya kolom ini yang dibentuk, sehingga kolom transaksi yang tidak dipakai tidak diduplikasi.
+    """
+    columns = columns or VIEW_COLS
+    txn_cols = [c for c in columns if c in TRANSACTION_COLS and c in transactions.columns]
+
+    rows = transactions.index.get_indexer(items["txn_id"].to_numpy())
+    view = transactions[txn_cols].take(rows).reset_index(drop=True)
+    for col in columns:
+        if col in ("Ticket Group", "Ticket Detail", "Ticket Purchased"):
+            view[col] = items[col].to_numpy() if col == "Ticket Purchased" else items[col].array
+        elif col == "Ticket Price":
+            view[col] = _decode_price(items).to_numpy()
+        elif col == "Total Payment":
+            view[col] = (items["Ticket Purchased"] * _decode_price(items)).to_numpy()
+        elif col == "Total Ticket Purchase":
+            view[col] = items["Ticket Purchased"].to_numpy()
+    return view[[c for c in columns if c in view.columns]]
+
+def transaction_view(transactions: pd.DataFrame, items: pd.DataFrame, columns: list | None = None) -> pd.DataFrame:
+    """
+    Tabel level transaksi + agregat item per transaksi ("Item Count", "Total Payment", "Total Ticket Purchase").
+    """
+    view = transactions[columns] if columns is not None else transactions.copy()
+    payment = items["Ticket Purchased"] * _decode_price(items)
+    grouped = pd.DataFrame({
+        "Item Count": 1,
+        "Total Payment": payment,
+        "Total Ticket Purchase": items["Ticket Purchased"],
+    }).groupby(items["txn_id"]).sum()
+    return view.join(grouped)
+
+def items_flag_any(items: pd.DataFrame, mask) -> pd.Series:
+    """True per txn_id jika minimal satu item memenuhi mask."""
+    return pd.Series(np.asarray(mask), index=items.index).groupby(items["txn_id"]).any()
+
+def txn_flag_any(transactions: pd.DataFrame, items: pd.DataFrame, mask) -> np.ndarray:
+    """items_flag_any disejajarkan dengan baris transactions (transaksi tanpa item -> False)."""
+    return items_flag_any(items, mask).reindex(transactions.index, fill_value=False).to_numpy()
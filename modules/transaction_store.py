@@ -0,0 +1,151 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from modules.ticket_transaction_etl import (
+    CLEAN_SCHEMA,
+    TRANSACTION_COLUMN_TYPES,
+    TRANSACTION_COLUMNS,
+    clean_batches,
+    clean_table_to_frame,
+)
+from utils.data_loading import iter_csv_batches
+
+# Lokasi store Parquet transaksi bersih (bisa diganti lewat env TRANSACTION_STORE_DIR)
+STORE_DIR = os.environ.get("TRANSACTION_STORE_DIR", os.path.join("data", "transactions"))
+
+# Ukuran chunk CSV saat ingest (memori puncak ~1 chunk; chunk besar tidak lebih cepat)
+INGEST_BLOCK_SIZE = 1 << 20
+
+# Partisi hive: Bulan=YYYY-MM/Ticket Group=<unit>/part-*.parquet
+PARTITION_SCHEMA = pa.schema([("Bulan", pa.string()), ("Ticket Group", pa.string())])
+_PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+def _month_key(value) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m")
+
+# Skema file Parquet: kolom ETL + posisi item dalam transaksi + kunci partisi bulan
+STORE_SCHEMA = CLEAN_SCHEMA.append(pa.field("Item Pos", pa.int32())).append(pa.field("Bulan", pa.string()))
+
+def _to_store_table(df: pd.DataFrame) -> pa.Table:
+    # Item Pos = posisi item dalam daftar item baris CSV asalnya (index clean_frame = baris asal),
+    # sehingga baris transaksi yang terulang menghasilkan kunci yang sama dan ter-dedupe
+    data = df.assign(**{
+        "Item Pos": df.groupby(level=0, sort=False).cumcount(),
+        "Bulan": df["Tgl Transaksi"].dt.strftime("%Y-%m"),
+    })
+    return pa.Table.from_pandas(data[STORE_SCHEMA.names], schema=STORE_SCHEMA, preserve_index=False)
+
+def _stored_keys(store_dir: str) -> pa.Table:
+    """Kunci (No Transaksi, Item Pos) yang sudah ada; hanya dua kolom ini yang dibaca dari store."""
+    if not stored_months(store_dir):
+        return pa.table({"No Transaksi": pa.array([], pa.string()), "Item Pos": pa.array([], pa.int32())})
+    dataset = ds.dataset(store_dir, format="parquet", partitioning=_PARTITIONING)
+    return dataset.to_table(columns=["No Transaksi", "Item Pos"])
+
+def _mark_seen(no_transaksi: pa.ChunkedArray, item_pos: pa.ChunkedArray, seen: set) -> np.ndarray:
+    """True untuk kunci (No Transaksi, Item Pos) yang sudah ada di `seen`; kunci baru ditambahkan."""
+    flags = np.empty(len(no_transaksi), dtype=bool)
+    for i, key in enumerate(zip(no_transaksi.to_pylist(), item_pos.to_pylist())):
+        flags[i] = key in seen
+        seen.add(key)
+    return flags
+
+def ingest_transactions(file, store_dir: str = STORE_DIR) -> dict:
+    """
+    Ingest inkremental export bulanan yang bisa saling tumpang tindih.
+
+    - CSV dibaca per chunk (iter_csv_batches); transaksi yang "No Transaksi"-nya sudah ada
+      di store dibuang sebelum dibersihkan, jadi ETL hanya berjalan untuk baris baru.
+    - Item baru di-dedupe per (No Transaksi, Item Pos) terhadap store dan semua chunk sebelumnya
+      dalam upload ini (baris transaksi yang terulang disimpan sekali), lalu langsung ditambahkan
+      ke partisi yang sesuai tanpa menulis ulang data lama. Memori puncak ~1 chunk + kunci upload.
+
+    Return: {"rows_read", "rows_cleaned", "items_added"}
+    """
+    existing = _stored_keys(store_dir)
+    known_ids = pc.unique(existing.column("No Transaksi"))
+    existing_keys = pd.MultiIndex.from_frame(existing.to_pandas())
+    stats = {"rows_read": 0, "rows_cleaned": 0, "items_added": 0}
+    seen = set()
+
+    def new_rows():
+        batches = iter_csv_batches(
+            file, column_types=TRANSACTION_COLUMN_TYPES, columns=TRANSACTION_COLUMNS, block_size=INGEST_BLOCK_SIZE
+        )
+        for batch in batches:
+            chunk = pa.Table.from_batches([batch])
+            chunk = chunk.filter(pc.invert(pc.is_in(chunk.column("No Transaksi"), value_set=known_ids)))
+            stats["rows_read"] += batch.num_rows
+            stats["rows_cleaned"] += chunk.num_rows
+            if chunk.num_rows:
+                yield chunk
+
+    def store_batches():
+        for df in clean_batches(new_rows()):
+            table = _to_store_table(df)
+            # Buang kunci yang sudah tersimpan / sudah muncul di chunk mana pun dari upload ini
+            keys = pd.MultiIndex.from_frame(table.select(["No Transaksi", "Item Pos"]).to_pandas())
+            duplicate = _mark_seen(table.column("No Transaksi"), table.column("Item Pos"), seen)
+            table = table.filter(pa.array(~(keys.isin(existing_keys) | duplicate)))
+            stats["items_added"] += table.num_rows
+            yield from table.to_batches()
+
+    ds.write_dataset(
+        store_batches(),
+        store_dir,
+        schema=STORE_SCHEMA,
+        format="parquet",
+        partitioning=_PARTITIONING,
+        existing_data_behavior="overwrite_or_ignore",
+        basename_template=f"ingest-{uuid.uuid4().hex}-{{i}}.parquet",
+    )
+    return stats
+
+def stored_months(store_dir: str = STORE_DIR) -> list[str]:
+    """Daftar bulan (YYYY-MM) yang tersedia, dibaca dari nama folder partisi tanpa membuka file."""
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(
+        name.split("=", 1)[1]
+        for name in os.listdir(store_dir)
+        if name.startswith("Bulan=")
+    )
+
+def load_transactions(
+    store_dir: str = STORE_DIR,
+    start=None,
+    end=None,
+    units: list | None = None,
+) -> pd.DataFrame:
+    """
+    Baca transaksi dari store; hanya partisi bulan di rentang [start, end] dan unit di `units`
+    yang dipindai. start/end berupa tanggal, keduanya inklusif (filter baris tetap per "Tgl Transaksi").
+    Hasil memakai skema yang sama dengan load_and_clean_data.
+    """
+    if not stored_months(store_dir):
+        return clean_table_to_frame(CLEAN_SCHEMA.empty_table())
+
+    dataset = ds.dataset(store_dir, format="parquet", partitioning=_PARTITIONING)
+
+    expr = None
+    conditions = []
+    if start is not None:
+        conditions.append(ds.field("Bulan") >= _month_key(start))
+        conditions.append(ds.field("Tgl Transaksi") >= pd.Timestamp(start))
+    if end is not None:
+        conditions.append(ds.field("Bulan") <= _month_key(end))
+        # end inklusif per hari: transaksi sepanjang hari terakhir ikut terbaca
+        conditions.append(ds.field("Tgl Transaksi") < pd.Timestamp(end).normalize() + pd.Timedelta(days=1))
+    if units is not None:
+        conditions.append(ds.field("Ticket Group").isin(list(units)))
+    for cond in conditions:
+        expr = cond if expr is None else expr & cond
+
+    table = dataset.to_table(columns=CLEAN_SCHEMA.names, filter=expr)
+    return clean_table_to_frame(table)
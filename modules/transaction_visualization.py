@@ -5,6 +5,8 @@ import altair as alt
 from ui.styles import BRAND_COLORS
 from ui.components import branded_metric, custom_metric
 from utils.helpers import format_rupiah
+from utils.ui_utils import render_aggrid, download_csv_button
+from modules.transaction_model import item_view, transaction_view, txn_flag_any
 
 def show_summary_cards(df):
     col1, col2 = st.columns(2)
@@ -35,7 +37,7 @@ def show_trend_payment(df_filtered):
     weekend_df["day_start"] = weekend_df["Tgl Transaksi"].dt.floor("D")
     weekend_df["day_end"] = weekend_df["Tgl Transaksi"].dt.floor("D") + pd.Timedelta(days=1)
 
-    trend = df_filtered.groupby(["Tgl Transaksi", "Ticket Group"]).agg({
+    trend = df_filtered.groupby(["Tgl Transaksi", "Ticket Group"], observed=True).agg({
         "Total Payment": "sum"
     }).reset_index()
 
@@ -76,7 +78,7 @@ def show_trend_purchased(df_filtered):
     weekend_df["day_start"] = weekend_df["Tgl Transaksi"].dt.floor("D")
     weekend_df["day_end"] = weekend_df["Tgl Transaksi"].dt.floor("D") + pd.Timedelta(days=1)
 
-    trend = df_filtered.groupby(["Tgl Transaksi", "Ticket Group"]).agg({
+    trend = df_filtered.groupby(["Tgl Transaksi", "Ticket Group"], observed=True).agg({
         "Ticket Purchased": "sum"
     }).reset_index()
 
@@ -110,7 +112,7 @@ def show_trend_purchased(df_filtered):
 def show_top5_payment(df_filtered):
     """Top 5 Ticket berdasarkan Payment"""
     top5_payment = (
-        df_filtered.groupby("Ticket Detail")["Total Payment"]
+        df_filtered.groupby("Ticket Detail", observed=True)["Total Payment"]
         .sum()
         .nlargest(5)
         .reset_index()
@@ -145,7 +147,7 @@ def show_top5_payment(df_filtered):
 def show_top5_purchased(df_filtered):
     """Top 5 Ticket berdasarkan Purchased"""
     top5_purchased = (
-        df_filtered.groupby("Ticket Detail")["Ticket Purchased"]
+        df_filtered.groupby("Ticket Detail", observed=True)["Ticket Purchased"]
         .sum()
         .nlargest(5)
         .reset_index()
@@ -209,7 +211,7 @@ def show_heatmap_calendar(df_filtered: pd.DataFrame):
 
 def show_total_payment_per_unit(df_filtered):
     total_payment_per_unit = (
-        df_filtered.groupby("Ticket Group")["Total Payment"]
+        df_filtered.groupby("Ticket Group", observed=True)["Total Payment"]
         .sum()
         .reset_index()
     )
@@ -224,32 +226,27 @@ def show_total_payment_per_unit(df_filtered):
         with cols[i]:
             branded_metric(label, value, unit)
 
-def show_customer_segmentation(df_filtered):
+def show_customer_segmentation(transactions, items, customer_col="Attendee Email"):
+    """
+    transactions, items : tabel hasil split_transactions / filter_model
+    customer_col        : kolom identitas customer, mis. "Customer ID" dari add_customer_ids.
+    """
     promo_tickets = [
         "Tiket Free Kendaraan Listrik - Mobil",
         "Tiket Free Kendaraan Listrik - Motor"
     ]
 
-    # 1️⃣ Cari transaksi yang hanya berisi tiket promo
-    df_txn_tickets = df_filtered.groupby("No Transaksi")["Ticket Detail"].unique().reset_index()
-    df_txn_tickets["is_promo_only"] = df_txn_tickets["Ticket Detail"].apply(
-        lambda tickets: set(tickets).issubset(set(promo_tickets))
-    )
-
-    # 2️⃣ Ambil transaksi valid (bukan promo-only)
-    valid_txn = df_txn_tickets[df_txn_tickets["is_promo_only"] == False]["No Transaksi"]
-    df_filtered = df_filtered[df_filtered["No Transaksi"].isin(valid_txn)]
+    # 1️⃣ Ambil transaksi valid (punya minimal satu tiket non-promo; 1 row per transaksi)
+    df_txn = transactions[txn_flag_any(transactions, items, ~items["Ticket Detail"].isin(promo_tickets))]
 
-    # 3️⃣ Balikin ke level transaksi (1 row per transaksi)
-    df_txn = df_filtered.groupby(["No Transaksi", "Attendee Email", "Attendee Phone"]) \
-               .agg({"Total Payment Transaction": "sum"}) \
-               .reset_index()
+    # 2️⃣ Level transaksi: hanya yang punya email & phone
+    df_txn = df_txn.dropna(subset=["Attendee Email", "Attendee Phone"])
 
-    # 4️⃣ Hitung transaksi per customer
-    buyer_counts = df_txn.groupby("Attendee Email")["No Transaksi"].nunique().reset_index()
-    buyer_counts.columns = ["Attendee Email", "Transaction Count"]
+    # 3️⃣ Hitung transaksi per customer
+    buyer_counts = df_txn.groupby(customer_col)["No Transaksi"].nunique().reset_index()
+    buyer_counts.columns = [customer_col, "Transaction Count"]
 
-    # 5️⃣ Segmentasi
+    # 4️⃣ Segmentasi
     repeat_buyers = buyer_counts[buyer_counts["Transaction Count"] > 1].shape[0]
     one_time_buyers = buyer_counts[buyer_counts["Transaction Count"] == 1].shape[0]
     unique_buyers = buyer_counts.shape[0]
@@ -261,7 +258,7 @@ def show_customer_segmentation(df_filtered):
     with col2: custom_metric("🆕 One-Time Buyers", f"{one_time_buyers:,}")
     with col3: custom_metric("🔁 Repeat Buyers", f"{repeat_buyers:,}")
 
-    # 6️⃣ Layout pie chart + tabel dalam satu row
+    # 5️⃣ Layout pie chart + tabel dalam satu row
     col_left, col_right = st.columns([1, 2])  
 
     with col_left:
@@ -292,7 +289,11 @@ def show_customer_segmentation(df_filtered):
 # RFM Segmentation
 # =====================
 
-def show_rfm_segmentation(df_filtered):
+def show_rfm_segmentation(transactions, items, customer_col="Attendee Email"):
+    """
+    transactions, items : tabel hasil split_transactions / filter_model
+    customer_col        : kolom identitas customer, mis. "Customer ID" dari add_customer_ids.
+    """
     st.subheader("📊 RFM Segmentation")
 
     # 🟣 Daftar tiket promo (langsung di dalam fungsi)
@@ -301,34 +302,34 @@ def show_rfm_segmentation(df_filtered):
         "Tiket Free Kendaraan Listrik - Motor"
     ]
 
-    # 0️⃣ Buang customer yang hanya membeli tiket promo
+    # 0️⃣ Level transaksi lewat join tabel item (Total Payment = jumlah semua item)
+    df_txn = transaction_view(transactions, items, columns=["No Transaksi", "Tgl Transaksi", customer_col])
+
+    # Buang customer yang hanya membeli tiket promo
     ticket_col = "Ticket Detail"
-    id_col = "Attendee Email"
+    id_col = customer_col
 
-    if ticket_col in df_filtered.columns and id_col in df_filtered.columns:
+    if ticket_col in items.columns and id_col in transactions.columns:
         # Ambil semua customer yang punya transaksi NON-promo
-        non_promo_customers = (
-            df_filtered.loc[~df_filtered[ticket_col].isin(promo_tickets), id_col]
-            .dropna()
-            .unique()
-        )
-        # Filter dataset agar hanya customer yang punya transaksi non-promo yang tersisa
-        df_filtered = df_filtered[df_filtered[id_col].isin(non_promo_customers)].copy()
+        has_non_promo = txn_flag_any(transactions, items, ~items[ticket_col].isin(promo_tickets))
+        non_promo_customers = df_txn.loc[has_non_promo, id_col].dropna().unique()
+        # Filter agar hanya customer yang punya transaksi non-promo yang tersisa
+        df_txn = df_txn[df_txn[id_col].isin(non_promo_customers)].copy()
 
     # 1️⃣ Pastikan kolom tanggal dalam format datetime
-    df_filtered["Tgl Transaksi"] = pd.to_datetime(df_filtered["Tgl Transaksi"])
+    df_txn["Tgl Transaksi"] = pd.to_datetime(df_txn["Tgl Transaksi"])
 
     # 2️⃣ Tentukan tanggal acuan (hari setelah transaksi terakhir)
-    today = df_filtered["Tgl Transaksi"].max() + pd.Timedelta(days=1)
+    today = df_txn["Tgl Transaksi"].max() + pd.Timedelta(days=1)
 
     # 3️⃣ Hitung nilai RFM untuk setiap customer
-    rfm = df_filtered.groupby("Attendee Email").agg({
+    rfm = df_txn.groupby(customer_col).agg({
         "Tgl Transaksi": lambda x: (today - x.max()).days,  # Recency
         "No Transaksi": "nunique",                         # Frequency
         "Total Payment": "sum"                             # Monetary
     }).reset_index()
 
-    rfm.columns = ["Attendee Email", "Recency", "Frequency", "Monetary"]
+    rfm.columns = [customer_col, "Recency", "Frequency", "Monetary"]
 
     # 4️⃣ Buat skor R, F, M (kuantil 1–5)
     rfm["R_Score"] = pd.qcut(rfm["Recency"], 5, labels=[5,4,3,2,1]).astype(int)
@@ -374,3 +375,13 @@ def show_rfm_segmentation(df_filtered):
     # 8️⃣ Tampilkan tabel
     st.markdown("###### **Detail Skor RFM per Customer**")
     st.dataframe(rfm.sort_values("RFM_Score", ascending=False), use_container_width=True)
+
+def show_item_table(transactions, items, filename, key):
+    """
+    AgGrid + tombol download CSV level item.
+    item_view lengkap (semua kolom) hanya dibentuk saat tabel dicentang, bukan di setiap rerun.
+    """
+    if st.checkbox("📄 Tampilkan tabel & download CSV", key=key):
+        df_items = item_view(transactions, items)
+        render_aggrid(df_items)
+        download_csv_button(df_items, filename=filename)
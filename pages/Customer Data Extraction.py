@@ -1,7 +1,12 @@
+import os
 import streamlit as st
 from utils.auth_utils import check_login
-from modules.ticket_transaction_etl import load_and_clean_data
-from modules.customer_extraction import extract_unique_customers
+from modules.ticket_transaction_etl import load_and_clean_data, ETL_VERSION, PARALLEL_WORKERS
+from utils.etl_cache import cached_etl, file_fingerprint
+from modules.customer_extraction import OUT_OF_CORE_MIN_ROWS, cached_extraction, extract_unique_customers
+from modules.customer_dedupe import dedupe_names
+from modules.customer_registry import REGISTRY_PATH, customer_status, update_registry
+from utils.export_utils import build_zip
 import pandas as pd
 
 st.set_page_config(
@@ -21,10 +26,21 @@ if "extract_clicked" not in st.session_state:
 uploaded_file = st.file_uploader("Upload CSV Anda", type=["csv"], key="file_customer_data")
 
 if uploaded_file is not None:
+    # Hash isi upload sekali per rerun: dipakai cache ETL, cache ekstraksi & registry
+    source_id = file_fingerprint(uploaded_file)
+
     # Load & bersihkan
-    st.session_state.df_customer_data = load_and_clean_data(uploaded_file)
+    st.session_state.df_customer_data = cached_etl(
+        load_and_clean_data, uploaded_file, ETL_VERSION, fingerprint=source_id, workers=PARALLEL_WORKERS
+    )
     df = st.session_state.get("df_customer_data")
 
+    if df.attrs.get("mismatched_item_rows"):
+        st.warning(f"⚠️ {df.attrs['mismatched_item_rows']} transaksi dilewati karena jumlah item antar kolom tiket tidak sama.")
+    if df.attrs.get("rejected_rows"):
+        detail = ", ".join(f"{col} ({n})" for col, n in df.attrs["rejected_by_column"].items())
+        st.warning(f"⚠️ {df.attrs['rejected_rows']} transaksi dilewati karena kolom wajib kosong: {detail}.")
+
     # --- Filter rentang Tgl Kunjungan sebelum ekstraksi ---
     visit_col = "Tgl Kunjungan"
 
@@ -37,10 +53,12 @@ if uploaded_file is not None:
         df[visit_col] = pd.to_datetime(df[visit_col], errors="coerce")
 
     has_visit = df[visit_col].notna().any()
+    # Rentang yang benar-benar dipakai untuk ekstraksi (None = semua data)
+    visit_range = None
 
     if not has_visit:
         st.warning(f"Tidak ada nilai pada kolom '{visit_col}'. Ekstraksi akan memakai semua data.")
-        df_filtered = df.copy()
+        df_filtered = df
     else:
         min_date = df[visit_col].min().date()
         max_date = df[visit_col].max().date()
@@ -59,20 +77,46 @@ if uploaded_file is not None:
 
         # Jika belum klik submit, tampilkan full range agar hasil tetap terlihat
         if not st.session_state.extract_clicked:
-            df_filtered = df.copy()
+            df_filtered = df
             st.info("Menampilkan hasil untuk seluruh rentang tanggal. Klik **Filter & Ekstrak Pelanggan** untuk menyaring.")
         else:
+            visit_range = (start_date, end_date)
             if start_date > end_date:
                 st.error("Rentang tanggal tidak valid: tanggal awal lebih besar daripada tanggal akhir.")
                 df_filtered = df.iloc[0:0].copy()
             else:
                 mask = df[visit_col].dt.date.between(start_date, end_date)
-                df_filtered = df.loc[mask].copy()
+                df_filtered = df.loc[mask]
                 if df_filtered.empty:
                     st.warning("Tidak ada data dalam rentang tanggal yang dipilih.")
 
     # --- Ekstraksi pelanggan unik per unit ---
-    customers_dict = extract_unique_customers(df_filtered)
+    resolve_identity = st.checkbox(
+        "Gabungkan customer yang berbagi email / phone (Customer ID)", key="resolve_identity_customer"
+    )
+    correct_domains = st.checkbox(
+        "Koreksi typo domain email (mis. gmial.com → gmail.com)", key="correct_domains_customer"
+    )
+    dedupe = st.checkbox(
+        "Tandai nama mirip (typo / urutan kata berbeda) sebagai satu cluster", key="dedupe_names_customer"
+    )
+    def extract_customers():
+        # Data besar (mis. satu tahun penuh) dikelompokkan per partisi di disk agar memori tidak habis
+        customers = extract_unique_customers(
+            df_filtered,
+            contact_cache=True,
+            resolve_identity=resolve_identity,
+            correct_domains=correct_domains,
+            out_of_core=len(df_filtered) >= OUT_OF_CORE_MIN_ROWS,
+            workers=PARALLEL_WORKERS,
+        )
+        if dedupe:
+            customers = {unit: dedupe_names(df_unit) for unit, df_unit in customers.items()}
+        return customers
+
+    # Hasil ekstraksi di-cache per (isi file, rentang tanggal, opsi): rerun tidak mengekstrak ulang
+    extraction_id = (source_id, ETL_VERSION, visit_range, resolve_identity, correct_domains, dedupe)
+    customers_dict = cached_extraction(extraction_id, extract_customers)
 
     if not customers_dict:
         st.warning("Tidak ada data customer yang valid / tidak ada unit yang sesuai.")
@@ -80,28 +124,44 @@ if uploaded_file is not None:
         st.success("✅ Data customer berhasil diekstrak!")
 
         st.markdown("### Hasil Per Unit")
+        # Status baru/kembali hanya jika registry customer sudah pernah diisi
+        has_registry = os.path.exists(REGISTRY_PATH)
+        since = visit_range[0] if visit_range else df_filtered[visit_col].min()
         for unit, df_unit in customers_dict.items():
-            st.write(f"**{unit}** – {len(df_unit)} customer unik")
+            label = f"**{unit}** – {len(df_unit)} customer unik"
+            if has_registry and len(df_unit) and pd.notna(since):
+                new_count = (customer_status(df_unit, since) == "Baru").sum()
+                label += f" ({new_count} baru)"
+            st.write(label)
             st.dataframe(df_unit.head(), use_container_width=True)
 
-            csv_bytes = df_unit.to_csv(index=False).encode("utf-8")
+        # --- Export: satu ZIP berisi file per unit + gabungan, dibuat hanya saat diminta ---
+        st.markdown("### Export")
+        formats = st.multiselect("Format file", ["csv", "parquet"], default=["csv"], key="export_formats")
+        export_id = extraction_id + (tuple(formats),)
+        if st.button("📦 Siapkan file ZIP", disabled=not formats):
+            frames = {f"{unit.replace(' ', '_')}_customers": df_unit for unit, df_unit in customers_dict.items()}
+            st.session_state.customers_zip = (
+                export_id, build_zip(frames, tuple(formats), combined_name="all_units_customers")
+            )
+
+        # Arsip lama (file / rentang / format berbeda) tidak ditawarkan lagi
+        prepared = st.session_state.get("customers_zip")
+        if prepared is not None and prepared[0] == export_id:
             st.download_button(
-                label=f"⬇️ Download data {unit}",
-                data=csv_bytes,
-                file_name=f"{unit.replace(' ', '_')}_customers.csv",
-                mime="text/csv",
-                key=f"dl_{unit}"
+                "⬇️ Download semua unit (ZIP)",
+                data=prepared[1],
+                file_name="customers_per_unit.zip",
+                mime="application/zip",
             )
 
-        # Gabungan semua unit
-        all_customers = pd.concat(customers_dict.values(), ignore_index=True)
-        all_csv = all_customers.to_csv(index=False).encode("utf-8")
-        st.download_button(
-            "⬇️ Download semua unit (gabungan)",
-            data=all_csv,
-            file_name="all_units_customers.csv",
-            mime="text/csv",
-        )
+        # --- Registry customer: catat kunjungan upload ini (upload yang sama tidak dihitung dua kali) ---
+        if st.button("🗂️ Simpan kunjungan ke registry customer"):
+            stats = update_registry(df, source_id=source_id, contact_cache=True)
+            if stats["skipped"]:
+                st.info("File ini sudah pernah dicatat di registry.")
+            else:
+                st.success(f"✅ {stats['contacts']:,} kontak dicatat ({stats['new']:,} kontak baru).")
 
         # --- Debug opsional di Cloud ---
         with st.expander("🔍 Debug info (opsional)"):
@@ -2,7 +2,8 @@
 import streamlit as st
 import pandas as pd
 
-from modules.customer_survey_etl import load_and_clean_data
+from modules.customer_survey_etl import load_and_clean_data, ETL_VERSION
+from utils.etl_cache import cached_etl
 from utils.auth_utils import check_login
 
 # >>> IMPORT modul visualisasi baru
@@ -31,7 +32,7 @@ uploaded_file = st.file_uploader("Upload CSV Anda", type=["csv"], key="file_ce")
 
 if uploaded_file is not None:
     # Load + simpan ke session (opsional)
-    st.session_state.df_ce = load_and_clean_data(uploaded_file)
+    st.session_state.df_ce = cached_etl(load_and_clean_data, uploaded_file, ETL_VERSION)
     df: pd.DataFrame = st.session_state.get("df_ce")
 
     # Opsi unit (bisa dipindah ke config)
@@ -2,7 +2,11 @@ import streamlit as st
 import pandas as pd
 
 # Import dari modules
-from modules.ticket_transaction_etl import load_and_clean_data
+from modules.ticket_transaction_etl import load_and_clean_data, ETL_VERSION, PARALLEL_WORKERS
+from modules.transaction_store import ingest_transactions, stored_months, load_transactions
+from modules.transaction_model import split_transactions, filter_model, CHART_COLS, item_view
+from utils.etl_cache import cached_etl, file_fingerprint
+from modules.customer_extraction import add_customer_ids
 from views import unit_ancol as ancol, unit_dufan as dufan, unit_atlantis as atlantis, unit_samudra as samudra, unit_seaworld as seaworld, unit_birdland as birdland
 from modules.transaction_visualization import (
     show_summary_cards,
@@ -14,8 +18,8 @@ from modules.transaction_visualization import (
     show_total_payment_per_unit,
     show_customer_segmentation,
     show_rfm_segmentation,
+    show_item_table,
 )
-from utils.ui_utils import render_aggrid, download_csv_button
 from utils.auth_utils import check_login
 
 st.set_page_config(
@@ -29,31 +33,92 @@ authenticator = check_login()
 # --- Main ---
 st.title("📊 Dashboard Monthly Transaction Report")
 
-# Upload CSV
-uploaded_file = st.file_uploader("Upload CSV Anda", type=["csv"], key="file_transaksi")
-
-if uploaded_file is not None:
-    st.session_state.df_transaksi = load_and_clean_data(uploaded_file)
-
-    df = st.session_state.get("df_transaksi")   
-
-    menu = st.sidebar.selectbox(
+# Nama menu -> nilai "Ticket Group" (dipakai untuk membaca partisi unit dari store)
+MENU_UNITS = {
+    "Ancol": "Ancol",
+    "Dufan": "Dufan Ancol",
+    "Atlantis": "Atlantis Ancol",
+    "Samudra": "Samudra Ancol",
+    "Sea World": "Sea World Ancol",
+    "Birdland": "Jakarta Bird Land Ancol",
+}
+
+def select_menu():
+    return st.sidebar.selectbox(
         "Pilih Unit",
-        ["Semua Transaksi", "Ancol", "Dufan", "Atlantis", "Samudra", "Sea World", "Birdland"],
+        ["Semua Transaksi", *MENU_UNITS],
         index=0
     )
 
+source = st.sidebar.radio("Sumber data", ["Upload CSV", "Data tersimpan"], key="source_transaksi")
+model = None
+
+if source == "Upload CSV":
+    # Upload CSV
+    uploaded_file = st.file_uploader("Upload CSV Anda", type=["csv"], key="file_transaksi")
+
+    if uploaded_file is not None:
+        # Hasil ETL di-cache dengan kunci yang sama dengan halaman Customer Data Extraction,
+        # sehingga satu upload hanya sekali melewati ETL; tabel transaksi & item dibentuk sekali per upload
+        source_id = file_fingerprint(uploaded_file)
+        if st.session_state.get("txn_model_source") != source_id:
+            df = cached_etl(
+                load_and_clean_data, uploaded_file, ETL_VERSION, fingerprint=source_id, workers=PARALLEL_WORKERS
+            )
+            st.session_state.txn_model = split_transactions(df)
+            st.session_state.txn_model_source = source_id
+
+        model = st.session_state.get("txn_model")
+        attrs = model[0].attrs
+
+        if attrs.get("mismatched_item_rows"):
+            st.warning(f"⚠️ {attrs['mismatched_item_rows']} transaksi dilewati karena jumlah item antar kolom tiket tidak sama.")
+        if attrs.get("rejected_rows"):
+            detail = ", ".join(f"{col} ({n})" for col, n in attrs["rejected_by_column"].items())
+            st.warning(f"⚠️ {attrs['rejected_rows']} transaksi dilewati karena kolom wajib kosong: {detail}.")
+
+        if st.button("💾 Tambahkan ke Data tersimpan"):
+            # Inkremental: transaksi yang sudah pernah disimpan dilewati
+            stats = ingest_transactions(uploaded_file)
+            st.success(
+                f"✅ {stats['items_added']:,} item baru disimpan "
+                f"({stats['rows_read'] - stats['rows_cleaned']:,} transaksi sudah ada dilewati). "
+                "Buka lagi lewat sumber **Data tersimpan**."
+            )
+
+        menu = select_menu()
+else:
+    # Data tersimpan: hanya partisi bulan & unit yang dipilih yang dibaca
+    months = stored_months()
+    if months:
+        start_month, end_month = st.sidebar.select_slider(
+            "Periode (bulan)", options=months, value=(months[0], months[-1])
+        )
+        menu = select_menu()
+        units = None if menu == "Semua Transaksi" else [MENU_UNITS[menu]]
+        st.session_state.txn_model_source = None
+        st.session_state.txn_model = split_transactions(load_transactions(
+            start=pd.Period(start_month).start_time,
+            end=pd.Period(end_month).end_time,
+            units=units,
+        ))
+        model = st.session_state.get("txn_model")
+
+if model is not None:
     if menu == "Semua Transaksi":
         st.subheader("📌 Semua Transaksi")
+        transactions, items = model
 
-        # Filter tanggal
-        min_date, max_date = df["Tgl Transaksi"].min(), df["Tgl Transaksi"].max()
+        # Filter tanggal (di tabel transaksi, item ikut lewat txn_id)
+        min_date, max_date = transactions["Tgl Transaksi"].min(), transactions["Tgl Transaksi"].max()
         start_date, end_date = st.date_input(
             "Pilih rentang tanggal:", [min_date, max_date],
             min_value=min_date, max_value=max_date
         )
-        mask = (df["Tgl Transaksi"] >= pd.to_datetime(start_date)) & (df["Tgl Transaksi"] <= pd.to_datetime(end_date))
-        df_filtered = df.loc[mask]
+        mask = (transactions["Tgl Transaksi"] >= pd.to_datetime(start_date)) & (transactions["Tgl Transaksi"] <= pd.to_datetime(end_date))
+        transactions, items = filter_model(transactions, items, txn_mask=mask)
+        # Chart cukup kolom ringkas; view lengkap hanya untuk tabel / download
+        df_filtered = item_view(transactions, items, columns=CHART_COLS)
 
         # Summary cards
         show_summary_cards(df_filtered)
@@ -74,20 +139,24 @@ if uploaded_file is not None:
         with col2:
             st.altair_chart(show_top5_purchased(df_filtered), use_container_width=True)
 
+        # 🔹 Identitas customer: email saja, atau gabungan email/phone (resolusi identitas)
+        resolve_identity = st.checkbox("Gabungkan customer yang berbagi email / phone", key="resolve_identity_transaksi")
+        if resolve_identity:
+            df_customers, customer_col = add_customer_ids(transactions, contact_cache=True), "Customer ID"
+        else:
+            df_customers, customer_col = transactions, "Attendee Email"
+
         # 🔹 Customer Segmentation
-        show_customer_segmentation(df_filtered)
+        show_customer_segmentation(df_customers, items, customer_col=customer_col)
 
         # 🔹 RFM Segmentation
-        show_rfm_segmentation(df_filtered)  
+        show_rfm_segmentation(df_customers, items, customer_col=customer_col)
 
         # 🔹 Heatmap Kunjungan per Hari
         st.altair_chart(show_heatmap_calendar(df_filtered), use_container_width=True)
 
-        # AgGrid
-        render_aggrid(df_filtered)
-
-        # Download button
-        download_csv_button(df_filtered, filename="transaksi_semua.csv")
+        # AgGrid & download CSV
+        show_item_table(transactions, items, filename="transaksi_semua.csv", key="tabel_semua")
 
     elif menu == "Ancol":
         ancol.show()
@@ -101,5 +170,7 @@ if uploaded_file is not None:
         seaworld.show()
     elif menu == "Birdland":
         birdland.show()
+elif source == "Upload CSV":
+    st.info("📂 Silakan upload file CSV terlebih dahulu untuk melihat dashboard.")
 else:
-    st.info("📂 Silakan upload file CSV terlebih dahulu untuk melihat dashboard.")
\ No newline at end of file
+    st.info("📂 Belum ada data tersimpan. Upload CSV lalu klik **Tambahkan ke Data tersimpan**.")
\ No newline at end of file
@@ -0,0 +1,34 @@
+import sqlite3
+
+import pandas as pd
+
+from utils import contact_cache
+
+def _upper(values):
+    return values.str.upper()
+
+def _disk_entries(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT raw, clean FROM entries"))
+    finally:
+        conn.close()
+
+def test_prune_to_low_water_mark_and_keep_memory_in_sync(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    for i in range(10):
+        contact_cache.cached_map("t", "1", pd.Series([f"v{i}"], dtype=object), _upper, path=path, max_rows=10)
+    assert len(_disk_entries(path)) == 10
+
+    # Batas terlampaui -> dipangkas ke 80% (8 entri), entri terlama dibuang lebih dulu
+    contact_cache.cached_map("t", "1", pd.Series(["v10"], dtype=object), _upper, path=path, max_rows=10)
+    on_disk = _disk_entries(path)
+    assert sorted(on_disk) == sorted(f"v{i}" for i in range(3, 11))
+
+    # Salinan memori tetap sama dengan disk (tidak dikosongkan seluruhnya)
+    assert contact_cache._loaded[(path, "t")][1] == on_disk
+
+    # Satu entri baru setelah pemangkasan tidak memicu pemangkasan lagi
+    contact_cache.cached_map("t", "1", pd.Series(["v11"], dtype=object), _upper, path=path, max_rows=10)
+    assert len(_disk_entries(path)) == 9
+    contact_cache.clear_contact_cache(path)
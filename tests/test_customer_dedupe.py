@@ -0,0 +1,21 @@
+import pandas as pd
+
+from modules.customer_dedupe import dedupe_names
+
+def test_similar_names_need_contact_evidence():
+    customers = pd.DataFrame({
+        "Attendee Name": ["Budi Santoso", "Santoso, Budi", "Budi Santosa", "Siti", "Siti", "Ani Santoso"],
+        "Attendee Email": ["budi@gmail.com", "budi@gmail.com", None, "s1@x.com", "s2@x.com", None],
+        "Attendee Phone": [None, "6281234567890", "6281234567890", None, "6281111111111", "6281234567890"],
+    })
+    out = dedupe_names(customers)
+
+    # Varian nama dengan email / phone yang sama -> satu cluster
+    assert out["Name Cluster"].tolist()[:3] == [0, 0, 0]
+    assert out.loc[2, "Name Confidence"] < 1.0
+    # Nama sama tanpa kontak bersama -> cluster terpisah, hanya dilaporkan sebagai kemungkinan
+    assert out.loc[3, "Name Cluster"] != out.loc[4, "Name Cluster"]
+    assert out.loc[3, "Possible Match"] == out.loc[4, "Name Cluster"]
+    assert out.loc[3, "Possible Match Confidence"] < 1.0
+    # Phone sama tetapi nama berbeda (anggota keluarga) tetap terpisah
+    assert out.loc[5, "Name Cluster"] == 5
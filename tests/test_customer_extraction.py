@@ -0,0 +1,169 @@
+import functools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import customer_extraction as ce
+from modules.customer_extraction import (
+    clean_email,
+    clean_phone,
+    correct_domain,
+    extract_unique_customers,
+    normalize_emails,
+    normalize_phones,
+)
+
+# Domain sah yang mirip domain dikenal tidak boleh "dikoreksi"
+VALID_LOOKALIKES = [
+    "yahoo.co.jp", "yahoo.co.uk", "outlook.co.jp", "cloud.com", "live.co.uk", "email.com",
+    "lime.com", "ail.com", "aim.com", "yahoo.fr", "hotmail.co.uk",
+]
+
+TYPOS = {
+    "gmial.com": "gmail.com",
+    "gmaill.com": "gmail.com",
+    "yahooo.com": "yahoo.com",
+    "hotmial.com": "hotmail.com",
+    "outlok.co.id": "outlook.co.id",
+    # contoh dari permintaan: typo sufiks & label pendek
+    "gmail.co": "gmail.com",
+    "gmai.com": "gmail.com",
+    "yahoo.co.idd": "yahoo.co.id",
+    "gmail.con": "gmail.com",
+    "yaho.co.id": "yahoo.co.id",
+}
+
+@pytest.mark.parametrize("domain", VALID_LOOKALIKES)
+def test_correct_domain_keeps_valid_domains(domain):
+    assert correct_domain(domain) == domain
+
+@pytest.mark.parametrize("typo, fixed", TYPOS.items())
+def test_correct_domain_fixes_typos(typo, fixed):
+    assert correct_domain(typo) == fixed
+
+def test_domain_correction_is_opt_in():
+    assert clean_email("U47@Yahoo.co.jp") == "u47@yahoo.co.jp"
+    assert clean_email("a@gmial.com") == "a@gmial.com"
+    assert clean_email("a@gmial.com", correct_domains=True) == "a@gmail.com"
+    assert clean_email("budi@gmail.co", correct_domains=True) == "budi@gmail.com"
+    assert clean_email("budi@yahoo.co.idd", correct_domains=True) == "budi@yahoo.co.id"
+
+    s = pd.Series(["u47@yahoo.co.jp", "a@gmial.com", None])
+    assert normalize_emails(s).tolist() == ["u47@yahoo.co.jp", "a@gmial.com", None]
+    assert normalize_emails(s, correct_domains=True).tolist() == ["u47@yahoo.co.jp", "a@gmail.com", None]
+
+# Hasil clean_phone versi awal (per nilai) untuk input tepi; normalisasi per kolom harus sama persis
+PHONES = {
+    "0812-3456-7890": "6281234567890",
+    "+62 812 3456 7890": "6281234567890",
+    "62+81234567890": "6281234567890",
+    "0062812345678": "62812345678",
+    "6208123456789": "628123456789",
+    "6812345678": "62812345678",
+    "60812345678": "62812345678",
+    "626281234567": "6281234567",
+    "6228123456789": "628123456789",
+    "81234567890": "6281234567890",
+    " 0857-1111-2222 ": "6285711112222",
+    "0899 1234 567": "628991234567",
+    "62812345678901": "62812345678901",
+    "(021) 5551234": None,
+    "08001234567": None,
+    "0812345": None,
+    "08123456789012345": None,
+    "+6281234567890 / 0813": None,
+    "abc": None,
+    "": None,
+    812345678901: "62812345678901",
+    8.12345678e9: "6281234567800",
+}
+
+def test_normalize_phones_matches_clean_phone():
+    values = pd.Series([*PHONES, None, np.nan, "0812-3456-7890"], dtype=object)
+    expected = [*PHONES.values(), None, None, "6281234567890"]
+    assert normalize_phones(values).tolist() == expected
+    assert [clean_phone(v) for v in values] == expected
+
+
+# Hasil clean_email versi awal (tanpa koreksi domain) untuk input tepi
+EMAILS = {
+    " Budi@Gmail.com ": "budi@gmail.com",
+    "budi @ gmail . com": "budi@gmail.com",
+    "nama saya@gmail.com": "namasaya@gmail.com",
+    "budi@gamil.com": "budi@gmail.com",
+    "BUDI@YHOO.COM": "budi@yahoo.com",
+    "u@hotnail.com": "u@hotmail.com",
+    "u@outlok.com": "u@outlook.com",
+    "a.b+tag@sub.domain.co.id": "a.b+tag@sub.domain.co.id",
+    "a_b@x-y.co": "a_b@x-y.co",
+    "a@-x.com": "a@-x.com",
+    "a@x..com": "a@x..com",
+    "budi": None,
+    "budi@": None,
+    "@gmail.com": None,
+    "a@b@c.com": None,
+    "a@gmail": None,
+    "ü@gmail.com": None,
+    "": None,
+}
+
+def test_normalize_emails_matches_clean_email():
+    values = pd.Series([*EMAILS, None, np.nan, " Budi@Gmail.com "], dtype=object)
+    expected = [*EMAILS.values(), None, None, "budi@gmail.com"]
+    assert normalize_emails(values).tolist() == expected
+    assert [clean_email(v) for v in values] == expected
+
+def _customers():
+    # Beberapa unit (termasuk nama alias UNIT_MAP), tiket promo, kontak kosong / tidak valid
+    return pd.DataFrame({
+        "Ticket Group": ["Ancol", "Ancol", "Dunia Fantasi", "Dufan Ancol", "Ancol", "Ancol", "Birdland",
+                         "Sea World Ancol", "Dufan Ancol", "Ancol", "Atlantis Ancol", "Ancol"],
+        "Ticket Detail": ["Reguler", "Reguler", "Reguler", "Anak", "Reguler",
+                          "Tiket Free Kendaraan Listrik - Mobil", "Reguler", "Reguler", "Reguler", "Anak",
+                          "Tiket Free Kendaraan Listrik - Motor", "Reguler"],
+        "Attendee Name": ["Budi", "Budi S", "Siti", "Siti A", "Andi", "Rina", "Joko", "Budi", "Tono", "Budi", "Rina", "Dewi"],
+        "Attendee Email": ["Budi@Gmail.com", "budi@gmail.com ", "siti@yahoo.com", "SITI@yahoo.com", None,
+                           "rina@gmail.com", "joko@gmail.com", "budi@gmail.com", "bad-email", "budi@gmail.com",
+                           "rina@gmail.com", None],
+        "Attendee Phone": ["0812-3456-7890", "+62 812 3456 7890", "0813 1111 2222", "081311112222", "0857 1234 5678",
+                           "0812 9999 8888", None, "081234567890", None, "0812 0000 1111", "0812 9999 8888", "12345"],
+        "Tgl Kunjungan": pd.to_datetime([
+            "2025-03-05", "2025-03-01", "2025-03-02", "2025-03-02", "2025-03-03", "2025-03-04",
+            "2025-03-06", "2025-03-07", "2025-03-08", "2025-03-09", "2025-03-10", "2025-03-11",
+        ]),
+    })
+
+# Hasil extract_unique_customers versi awal (loop per unit); kontak kosong ditulis ""
+EXPECTED_CUSTOMERS = {
+    "Ancol": [
+        ["Budi", "budi@gmail.com", "6281200001111", "09/03/2025"],
+        ["Budi", "budi@gmail.com", "6281234567890", "01/03/2025;05/03/2025"],
+        ["Andi", "", "6285712345678", "03/03/2025"],
+    ],
+    "Dufan Ancol": [["Siti A", "siti@yahoo.com", "6281311112222", "02/03/2025"]],
+    "Atlantis Ancol": [],
+    "Sea World Ancol": [["Budi", "budi@gmail.com", "6281234567890", "07/03/2025"]],
+    "Jakarta Bird Land Ancol": [["Joko", "joko@gmail.com", "", "06/03/2025"]],
+}
+
+def test_extract_unique_customers_matches_per_unit_loop():
+    result = extract_unique_customers(_customers())
+    assert list(result) == list(EXPECTED_CUSTOMERS)
+    for unit, rows in EXPECTED_CUSTOMERS.items():
+        assert list(result[unit].columns) == ["Attendee Name", "Attendee Email", "Attendee Phone", "Tgl Kunjungan (Semua)"]
+        assert result[unit].fillna("").values.tolist() == rows
+
+
+@pytest.mark.parametrize("resolve_identity", [False, True])
+def test_out_of_core_matches_in_memory(monkeypatch, resolve_identity):
+    # potongan & partisi kecil: grup yang sama tersebar di beberapa potongan
+    monkeypatch.setattr(ce, "_customer_chunks", functools.partial(ce._customer_chunks, chunk_rows=3))
+    monkeypatch.setattr(ce, "OUT_OF_CORE_PARTITIONS", 3)
+    df = pd.concat([_customers(), _customers().assign(**{"Tgl Kunjungan": lambda d: d["Tgl Kunjungan"] + pd.Timedelta(days=30)})])
+
+    expected = extract_unique_customers(df, resolve_identity=resolve_identity)
+    result = extract_unique_customers(df, resolve_identity=resolve_identity, out_of_core=True)
+    assert list(result) == list(expected)
+    for unit in expected:
+        pd.testing.assert_frame_equal(result[unit], expected[unit])
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from modules.customer_registry import contact_keys, lookup_registry, update_registry
+
+def _visits(days):
+    return pd.DataFrame({
+        "Attendee Name": "Budi",
+        "Attendee Email": "budi@gmail.com",
+        "Attendee Phone": "081234567890",
+        "Tgl Kunjungan": pd.to_datetime(days),
+        "Ticket Group": "Ancol",
+        "Ticket Detail": "Reguler",
+    })
+
+def test_overlapping_uploads_do_not_double_count_visits(tmp_path):
+    path = str(tmp_path / "registry.sqlite")
+    # Januari, lalu Januari-Maret (export bulanan yang tumpang tindih)
+    update_registry(_visits(["2025-01-05", "2025-01-20"]), "jan", path=path)
+    stats = update_registry(_visits(["2025-01-05", "2025-01-20", "2025-03-02"]), "jan-mar", path=path)
+    assert stats["new"] == 0
+
+    email_key, _ = contact_keys(pd.Series(["budi@gmail.com"]), pd.Series([None], dtype=object))
+    entry = lookup_registry(email_key, path).loc[email_key[0]]
+    assert entry["visits"] == 3
+    assert (entry["first_seen"], entry["last_seen"]) == ("2025-01-05", "2025-03-02")
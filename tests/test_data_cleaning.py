@@ -0,0 +1,28 @@
+import pandas as pd
+
+from utils.data_cleaning import clean_empty_rows
+
+def test_clean_empty_rows_keeps_reject_summary():
+    df = pd.DataFrame({
+        "Attendee Name": ["Budi", None, "  ", "Siti"],
+        "Attendee Email": ["b@gmail.com", "x@gmail.com", None, "s@gmail.com"],
+        "Ticket Group": ["Ancol", "", "Ancol", "Ancol"],
+    })
+    out = clean_empty_rows(df, subset=["Attendee Name", "Attendee Email"])
+
+    assert out["Attendee Name"].tolist() == ["Budi", "Siti"]
+    assert out.attrs["rejected_rows"] == 2
+    # satu baris bisa ditolak lebih dari satu kolom; kolom di luar subset tidak dicek
+    assert out.attrs["rejected_by_column"] == {"Attendee Name": 2, "Attendee Email": 1}
+
+def test_date_format_inferred_from_first_non_blank_value():
+    from utils.data_cleaning import convert_to_datetime
+
+    # baris pertama kosong (string Arrow, bukan null): format dikunci dari "2025-03-01 10:00:00"
+    values = ["", "2025-03-01 10:00:00", "05/03/2025 10:00"]
+    df = pd.DataFrame({"Tgl Transaksi": pd.Series(values, dtype="string[pyarrow]")})
+    out = convert_to_datetime(df, ["Tgl Transaksi"])["Tgl Transaksi"]
+
+    expected = pd.to_datetime(pd.Series([None, *values[1:]]), errors="coerce")
+    assert out.tolist()[1] == pd.Timestamp("2025-03-01 10:00:00")
+    assert out.isna().tolist() == expected.isna().tolist() == [True, False, True]
@@ -0,0 +1,35 @@
+import io
+
+from utils.data_loading import read_csv_arrow
+
+CSV = """No Transaksi,Tgl Transaksi
+TRX1,2025-01-01 08:00:00
+TRX2,2025-01-31 18:30:00
+TRX3,2025-02-01 00:00:00
+"""
+
+def test_between_filter_includes_whole_end_day():
+    filters = [("Tgl Transaksi", "between", ("2025-01-01", "2025-01-31"))]
+    table = read_csv_arrow(io.BytesIO(CSV.encode()), filters=filters)
+    assert table.column("No Transaksi").to_pylist() == ["TRX1", "TRX2"]
+
+def test_between_filter_keeps_explicit_end_time():
+    filters = [("Tgl Transaksi", "between", ("2025-01-01", "2025-01-31 12:00"))]
+    table = read_csv_arrow(io.BytesIO(CSV.encode()), filters=filters)
+    assert table.column("No Transaksi").to_pylist() == ["TRX1"]
+
+def test_null_sentinels_match_pandas():
+    import pandas as pd
+    import pyarrow as pa
+
+    csv = "Attendee Name,Attendee Phone\n" + "\n".join(
+        f"{v},{v}" for v in ["Budi", "NA", "N/A", "null", "", "NaN", "None", "nan", "<NA>", "#N/A"]
+    ) + "\n"
+    expected = pd.read_csv(io.BytesIO(csv.encode()), dtype=str)
+    table = read_csv_arrow(
+        io.BytesIO(csv.encode()),
+        column_types={"Attendee Name": pa.string(), "Attendee Phone": pa.string()},
+    )
+    out = table.to_pandas()
+    assert out.isna().equals(expected.isna())
+    assert out["Attendee Name"].tolist()[0] == "Budi"
@@ -0,0 +1,22 @@
+import io
+
+import pandas as pd
+
+from utils import etl_cache
+
+def _etl(file):
+    return pd.DataFrame({"n": [len(file.getvalue())]})
+
+def test_precomputed_fingerprint_is_not_rehashed(monkeypatch):
+    etl_cache.clear_etl_cache()
+    file = io.BytesIO(b"a,b\n1,2\n")
+    fingerprint = etl_cache.file_fingerprint(file)
+
+    def no_hash(_):
+        raise AssertionError("file di-hash ulang")
+
+    monkeypatch.setattr(etl_cache, "file_fingerprint", no_hash)
+    first = etl_cache.cached_etl(_etl, file, 1, fingerprint=fingerprint)
+    again = etl_cache.cached_etl(_etl, file, 1, fingerprint=fingerprint)
+    pd.testing.assert_frame_equal(first, again)
+    etl_cache.clear_etl_cache()
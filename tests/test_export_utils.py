@@ -0,0 +1,20 @@
+import io
+import zipfile
+
+import pandas as pd
+
+from utils.export_utils import build_zip
+
+def test_parquet_export_with_empty_unit():
+    cols = ["Attendee Name", "Attendee Email", "Attendee Phone", "Tgl Kunjungan (Semua)"]
+    frames = {
+        "Ancol_customers": pd.DataFrame([["Budi", "b@gmail.com", None, "01/01/2025"]], columns=cols),
+        # kolom berbeda & kosong: kolom hasil reindex bertipe double tidak boleh bentrok dengan string
+        "Dufan_Ancol_customers": pd.DataFrame({c: pd.Series(dtype=object) for c in cols[:3]}).assign(
+            **{"Tgl Kunjungan": pd.Series(dtype="datetime64[ns]")}
+        ),
+    }
+    data = build_zip(frames, ("csv", "parquet"), combined_name="all_units_customers")
+    names = zipfile.ZipFile(io.BytesIO(data)).namelist()
+    assert "all_units_customers.parquet" in names
+    assert "Dufan_Ancol_customers.parquet" in names
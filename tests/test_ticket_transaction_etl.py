@@ -0,0 +1,57 @@
+import io
+
+import pandas as pd
+
+from modules import ticket_transaction_etl as etl
+
+HEADER = "No Transaksi,Tgl Transaksi,Tgl Kunjungan,Attendee Name,Attendee Email,Attendee Phone,Status,Ticket Group,Ticket Detail,Ticket Purchased,Ticket Price,Total Ticket Purchase,Total Payment\n"
+ROW = 'TRX{i},2025-03-{day:02d} 10:00:00,2025-03-{day:02d},Budi,budi{i}@gmail.com,0812345678{i:02d},Paid,Ancol;Dufan Ancol,Tiket Reguler;Tiket Anak,1;2,100000;50000,3,200000\n'
+
+def _csv(rows=60):
+    return HEADER + "".join(ROW.format(i=i, day=i % 28 + 1) for i in range(rows))
+
+def test_streamed_upload_matches_in_memory(monkeypatch):
+    data = _csv().encode()
+    expected = etl.load_and_clean_data(io.BytesIO(data))
+
+    # chunk kecil: banyak chunk, format tanggal & tipe tetap sama
+    chunked = etl.clean_table_to_frame(etl.stream_clean_data(io.BytesIO(data), block_size=1024))
+    pd.testing.assert_frame_equal(chunked, expected.reset_index(drop=True))
+
+    # upload "besar" otomatis lewat stream_clean_data
+    monkeypatch.setattr(etl, "STREAM_MIN_BYTES", 0)
+    streamed = etl.load_and_clean_data(io.BytesIO(data))
+    pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True))
+
+def test_date_formats_skip_blank_values():
+    import pyarrow as pa
+
+    table = pa.table({
+        "Tgl Transaksi": ["", "  ", "2025-03-01 10:00:00"],
+        "Tgl Kunjungan": [None, "", ""],
+    })
+    assert etl._date_formats(table) == {"Tgl Transaksi": "%Y-%m-%d %H:%M:%S"}
+
+def _old_totals(df):
+    # Implementasi lama (apply per baris), acuan hasil yang harus tetap sama
+    payment = df.apply(
+        lambda x: sum(
+            pd.to_numeric(i, errors="coerce") * pd.to_numeric(p, errors="coerce")
+            for i, p in zip(str(x["Ticket Purchased"]).split(";"), str(x["Ticket Price"]).split(";"))
+        ),
+        axis=1,
+    )
+    purchased = df["Ticket Purchased"].apply(lambda x: sum(pd.to_numeric(i, errors="coerce") for i in str(x).split(";")))
+    return payment.astype(float), purchased.astype(float)
+
+def test_totals_per_row_match_old_implementation():
+    df = pd.DataFrame({
+        "Ticket Purchased": ["1;2", "3", " 2 ;1", "1;2;3", "", None, "abc;1", "2.5;nan", "1;2", 4],
+        "Ticket Price": ["100;200", "50", "1000; 500", "10;20", "100", "100", "1;1", "2;2", "100", "25"],
+    }, index=[10, 3, 7, 0, 5, 8, 1, 2, 4, 9])
+    qty = etl._flatten_items(df["Ticket Purchased"])
+    prc = etl._flatten_items(df["Ticket Price"])
+
+    payment, purchased = _old_totals(df)
+    pd.testing.assert_series_equal(etl._total_payment_per_row(qty, prc, df.index), payment, check_names=False)
+    pd.testing.assert_series_equal(etl._total_purchased_per_row(qty, df.index), purchased, check_names=False)
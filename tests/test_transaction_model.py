@@ -0,0 +1,33 @@
+import pandas as pd
+
+from modules.transaction_model import filter_model, item_view, split_transactions
+
+def _items():
+    return pd.DataFrame({
+        # TRX2 dipakai ulang untuk transaksi lain (tanggal & email berbeda)
+        "No Transaksi": ["TRX1", "TRX1", "TRX2", "TRX2"],
+        "Tgl Transaksi": pd.to_datetime(["2025-03-01", "2025-03-01", "2025-03-02", "2025-03-05"]),
+        "Attendee Email": ["a@gmail.com", "a@gmail.com", "b@gmail.com", "c@gmail.com"],
+        "Ticket Group": ["Ancol", "Dufan Ancol", "Ancol", "Ancol"],
+        "Ticket Detail": ["Reguler", "Reguler", "Anak", "Reguler"],
+        "Ticket Purchased": [1, 2, 3, 1],
+        "Ticket Price": [100, 200, 50, 100],
+        "Total Ticket Purchase": [1, 2, 3, 1],
+        "Total Payment": [100, 400, 150, 100],
+    })
+
+def test_item_view_round_trip():
+    df = _items()
+    transactions, items = split_transactions(df)
+    assert len(transactions) == 3
+    pd.testing.assert_frame_equal(item_view(transactions, items), df, check_dtype=False, check_categorical=False)
+
+def test_filter_model_by_unit_and_date():
+    transactions, items = split_transactions(_items())
+    transactions, items = filter_model(transactions, items, item_mask=items["Ticket Group"] == "Ancol")
+    mask = transactions["Tgl Transaksi"] <= pd.Timestamp("2025-03-02")
+    transactions, items = filter_model(transactions, items, txn_mask=mask)
+
+    view = item_view(transactions, items)
+    assert view["Attendee Email"].tolist() == ["a@gmail.com", "b@gmail.com"]
+    assert view["Total Payment"].tolist() == [100, 150]
@@ -0,0 +1,34 @@
+from datetime import date
+
+from modules.transaction_store import ingest_transactions, load_transactions
+
+CSV = """No Transaksi,Tgl Transaksi,Tgl Kunjungan,Attendee Name,Attendee Email,Attendee Phone,Status,Ticket Group,Ticket Detail,Ticket Purchased,Ticket Price,Total Ticket Purchase,Total Payment
+TRX1,2025-02-27 10:00:00,2025-02-28,Budi,budi@gmail.com,081234567890,Paid,Ancol,Tiket Reguler,1,100000,1,100000
+TRX2,2025-02-28 18:30:00,2025-03-01,Siti,siti@gmail.com,081298765432,Paid,Ancol,Tiket Reguler,2,100000,2,200000
+TRX3,2025-03-01 08:00:00,2025-03-01,Andi,andi@gmail.com,081211112222,Paid,Ancol,Tiket Reguler,1,100000,1,100000
+"""
+
+def test_end_date_includes_whole_last_day(tmp_path):
+    csv = tmp_path / "transaksi.csv"
+    csv.write_text(CSV)
+    store = str(tmp_path / "store")
+    ingest_transactions(str(csv), store_dir=store)
+
+    df = load_transactions(store, start=date(2025, 2, 1), end=date(2025, 2, 28))
+    assert sorted(df["No Transaksi"]) == ["TRX1", "TRX2"]
+
+def test_repeated_rows_are_stored_once_across_chunks(tmp_path, monkeypatch):
+    import modules.transaction_store as store_module
+
+    # transaksi multi-item yang sama terulang, di chunk berbeda (chunk CSV kecil)
+    row = "TRX9,2025-03-01 09:00:00,2025-03-02,Rina,rina@gmail.com,081233334444,Paid,Ancol;Dufan Ancol,Tiket Reguler;Tiket Anak,1;2,100000;50000,3,200000\n"
+    lines = CSV.splitlines(keepends=True)
+    csv = tmp_path / "transaksi.csv"
+    csv.write_text(lines[0] + row + "".join(lines[1:]) * 20 + row)
+    monkeypatch.setattr(store_module, "INGEST_BLOCK_SIZE", 1024)
+
+    store = str(tmp_path / "store")
+    stats = ingest_transactions(str(csv), store_dir=store)
+    df = load_transactions(store)
+    assert stats["items_added"] == len(df) == 5
+    assert sorted(df.loc[df["No Transaksi"] == "TRX9", "Ticket Detail"]) == ["Tiket Anak", "Tiket Reguler"]
@@ -0,0 +1,71 @@
+import pandas as pd
+
+from modules import transaction_visualization as tv
+from modules.transaction_model import split_transactions
+
+PROMO = "Tiket Free Kendaraan Listrik - Mobil"
+
+# (No Transaksi, Tgl Transaksi, email, [(Ticket Detail, qty, harga), ...])
+TRANSACTIONS = [
+    ("T1", "2025-03-01", "a", [("Reguler", 2, 100), ("Anak", 1, 50)]),
+    ("T2", "2025-03-05", "a", [("Reguler", 1, 100)]),
+    ("T3", "2025-03-10", "a", [(PROMO, 1, 0)]),
+    ("T4", "2025-03-02", "b", [("Reguler", 4, 100)]),
+    ("T5", "2025-03-08", "c", [("Anak", 1, 50)]),
+    ("T6", "2025-03-09", "c", [("Reguler", 1, 100), (PROMO, 1, 0)]),
+    ("T7", "2025-03-03", "d", [(PROMO, 2, 0)]),
+    ("T8", "2025-03-04", "e", [("Reguler", 3, 100)]),
+    ("T9", "2025-03-06", "f", [("Reguler", 1, 100)]),
+    ("T10", "2025-03-07", "g", [("Anak", 2, 50)]),
+    ("T11", "2025-03-11", "g", [("Reguler", 5, 100)]),
+    ("T12", "2025-03-12", "h", [("Reguler", 1, 100)]),
+    ("T13", "2025-03-12", "i", [("Reguler", 6, 100), ("Anak", 2, 50)]),
+    ("T14", "2025-03-02", "j", [("Anak", 1, 50)]),
+]
+
+def _model():
+    rows = [
+        {
+            "No Transaksi": no, "Tgl Transaksi": pd.Timestamp(day),
+            "Attendee Email": f"{name}@gmail.com", "Attendee Phone": f"6281{ord(name):010d}",
+            "Ticket Group": "Ancol", "Ticket Detail": detail,
+            "Ticket Purchased": qty, "Ticket Price": price, "Total Payment": qty * price,
+        }
+        for no, day, name, lines in TRANSACTIONS
+        for detail, qty, price in lines
+    ]
+    return split_transactions(pd.DataFrame(rows))
+
+def _capture(monkeypatch):
+    shown = {"metric": [], "table": []}
+    monkeypatch.setattr(tv, "custom_metric", lambda label, value, *a, **k: shown["metric"].append((label, value)))
+    monkeypatch.setattr(tv.st, "dataframe", lambda df, *a, **k: shown["table"].append(df))
+    return shown
+
+# Hasil versi awal (tabel item hasil explode, satu baris per tiket) untuk data yang sama
+def test_customer_segmentation_matches_item_level_version(monkeypatch):
+    shown = _capture(monkeypatch)
+    tv.show_customer_segmentation(*_model())
+
+    assert shown["metric"] == [("👤 Unique Buyers", "9"), ("🆕 One-Time Buyers", "6"), ("🔁 Repeat Buyers", "3")]
+    assert shown["table"][0].to_dict("list") == {
+        "Attendee Email": ["a@gmail.com", "c@gmail.com", "g@gmail.com"],
+        "Transaction Count": [2, 2, 2],
+    }
+
+def test_rfm_segmentation_matches_item_level_version(monkeypatch):
+    shown = _capture(monkeypatch)
+    tv.show_rfm_segmentation(*_model())
+
+    assert shown["metric"] == [("👤 Total Customers", "9"), ("🧡 Loyal Customers", "3"), ("💔 Lost Customers", "1")]
+    rfm = shown["table"][0]
+    assert rfm["Attendee Email"].str[0].tolist() == ["g", "a", "i", "c", "h", "b", "e", "j", "f"]
+    assert rfm["Recency"].tolist() == [2, 3, 1, 4, 1, 11, 9, 11, 7]
+    assert rfm["Frequency"].tolist() == [2, 3, 1, 2, 1, 1, 1, 1, 1]
+    assert rfm["Monetary"].tolist() == [600, 350, 700, 150, 100, 400, 300, 50, 100]
+    assert rfm["RFM_Score"].tolist() == [14, 13, 13, 9, 9, 6, 6, 6, 5]
+    assert rfm["Segment"].tolist() == [
+        "🧡 Loyal Customer", "🧡 Loyal Customer", "🧡 Loyal Customer",
+        "💛 Potential Loyalist", "💛 Potential Loyalist",
+        "💤 Needs Attention", "💤 Needs Attention", "💤 Needs Attention", "💔 Lost",
+    ]
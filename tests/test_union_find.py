@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from modules.customer_extraction import _customer_key_id, resolve_customer_ids
+from utils.union_find import connected_components
+
+def test_connected_components_labels_smallest_node():
+    # 0-1-4 berantai, 2-3, 5 sendiri
+    labels = connected_components(np.array([4, 2, 1]), np.array([1, 3, 0]), 6)
+    assert labels.tolist() == [0, 0, 2, 2, 0, 5]
+
+def test_connected_components_long_chain():
+    n = 1000
+    labels = connected_components(np.arange(1, n), np.arange(n - 1), n)
+    assert (labels == 0).all()
+
+def test_resolve_customer_ids_groups_shared_contacts():
+    email = pd.Series(["a@x.com", "b@x.com", "b@x.com", "c@x.com", None, None, "d@x.com", None])
+    phone = pd.Series(["621", "621", "622", None, "622", None, "623", "624"])
+    ids = resolve_customer_ids(email, phone)
+
+    # a & b berbagi phone 621, b & baris tanpa email berbagi 622 -> satu customer
+    group = _customer_key_id("e:a@x.com")
+    assert ids.tolist() == [
+        group, group, group, _customer_key_id("e:c@x.com"), group, None,
+        _customer_key_id("e:d@x.com"), _customer_key_id("p:624"),
+    ]
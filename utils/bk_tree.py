@@ -0,0 +1,63 @@
+def levenshtein(a: str, b: str) -> int:
+    """
+    Edit distance (insert / delete / substitute) antara dua string.
+    Bit-parallel (Myers / Hyyro): satu kolom DP per karakter b dikerjakan sebagai operasi bit integer.
+    """
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    peq = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    last = 1 << (len(a) - 1)
+    vp, vn, dist = (1 << len(a)) - 1, 0, len(a)
+    for ch in b:
+        x = peq.get(ch, 0)
+        d0 = (((x & vp) + vp) ^ vp) | x | vn
+        hp = vn | ~(d0 | vp)
+        hn = d0 & vp
+        if hp & last:
+            dist += 1
+        elif hn & last:
+            dist -= 1
+        x = (hp << 1) | 1
+        vn = x & d0
+        vp = (hn << 1) | ~(x | d0)
+    return dist
+
+def build_bk_tree(words) -> tuple | None:
+    """
+    BK-tree dari daftar kata: node = (kata, {jarak: anak}).
+    Pencarian hanya menelusuri anak dengan jarak di [d - max_dist, d + max_dist] (ketaksamaan segitiga).
+    """
+    root = None
+    for word in dict.fromkeys(words):
+        if root is None:
+            root = (word, {})
+            continue
+        node = root
+        while True:
+            d = levenshtein(word, node[0])
+            if d == 0:
+                break
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                break
+            node = child
+    return root
+
+def bk_search(tree: tuple | None, word: str, max_dist: int) -> list:
+    """Semua kata di tree dengan jarak <= max_dist dari word, sebagai [(jarak, kata)] terurut."""
+    found = []
+    stack = [tree] if tree is not None else []
+    while stack:
+        node_word, children = stack.pop()
+        d = levenshtein(word, node_word)
+        if d <= max_dist:
+            found.append((d, node_word))
+        for dist, child in children.items():
+            if d - max_dist <= dist <= d + max_dist:
+                stack.append(child)
+    return sorted(found)
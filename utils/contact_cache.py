@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+# Cache normalisasi kontak di disk (bisa diganti lewat env CONTACT_CACHE_PATH)
+CONTACT_CACHE_PATH = os.environ.get("CONTACT_CACHE_PATH", os.path.join("data", "contact_cache.sqlite"))
+# Batas jumlah entri; entri yang paling lama disimpan dibuang lebih dulu
+CONTACT_CACHE_MAX_ROWS = 2_000_000
+# Saat batas terlampaui, cache dipangkas sampai fraksi ini dari max_rows (tidak dipangkas di setiap panggilan)
+CONTACT_CACHE_PRUNE_TO = 0.8
+
+# Salinan isi cache di memori per (path, kind): dibaca dari disk sekali per proses
+_loaded = {}
+_lock = threading.Lock()
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " kind TEXT NOT NULL, raw TEXT NOT NULL, clean TEXT, added REAL NOT NULL,"
+        " PRIMARY KEY (kind, raw))"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS entries_added ON entries (added)")
+    conn.execute("CREATE TABLE IF NOT EXISTS versions (kind TEXT PRIMARY KEY, version TEXT NOT NULL)")
+    return conn
+
+def _entries(conn: sqlite3.Connection, path: str, kind: str, version: str) -> dict:
+    cached = _loaded.get((path, kind))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with conn:
+        # Versi aturan berubah -> semua entri jenis ini tidak berlaku lagi
+        row = conn.execute("SELECT version FROM versions WHERE kind = ?", (kind,)).fetchone()
+        if row is None or row[0] != version:
+            conn.execute("DELETE FROM entries WHERE kind = ?", (kind,))
+            conn.execute("INSERT OR REPLACE INTO versions (kind, version) VALUES (?, ?)", (kind, version))
+    known = dict(conn.execute("SELECT raw, clean FROM entries WHERE kind = ?", (kind,)))
+    _loaded[(path, kind)] = (version, known)
+    return known
+
+def _prune(conn: sqlite3.Connection, max_rows: int) -> list:
+    """Buang entri terlama sampai tersisa CONTACT_CACHE_PRUNE_TO * max_rows; kembalikan (kind, raw) yang dibuang."""
+    count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    if count <= max_rows:
+        return []
+    excess = count - int(max_rows * CONTACT_CACHE_PRUNE_TO)
+    return conn.execute(
+        "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY added LIMIT ?) RETURNING kind, raw",
+        (excess,),
+    ).fetchall()
+
+def cached_map(
+    kind: str,
+    version: str,
+    values: pd.Series,
+    func,
+    path: str | None = None,
+    max_rows: int = CONTACT_CACHE_MAX_ROWS,
+) -> pd.Series:
+    """
+    Seperti func(values), tetapi hasil per string disimpan di SQLite.
+    - kind    : nama normalisasi ("phone", "email", ...)
+    - version : kunci versi aturan; jika berbeda dari yang tersimpan, cache jenis ini dikosongkan
+    - values  : Series object berisi nilai unik (lihat map_unique); nilai non-string tidak di-cache
+    Hanya nilai yang belum pernah dilihat yang diproses func lalu ditambahkan ke disk.
+    """
+    path = path or CONTACT_CACHE_PATH
+    values = values.reset_index(drop=True)
+
+    with _lock:
+        conn = _connect(path)
+        try:
+            known = _entries(conn, path, kind, version)
+            hit = values.map(lambda v: isinstance(v, str) and v in known).to_numpy(dtype=bool)
+            result = pd.Series(None, index=values.index, dtype=object)
+            result[hit] = [known[v] for v in values[hit]]
+            if hit.all():
+                return result
+
+            missing = values[~hit]
+            fresh = pd.Series(func(missing), dtype=object).to_numpy()
+            result[~hit] = fresh
+            now = time.time()
+            rows = [(kind, raw, clean, now) for raw, clean in zip(missing, fresh) if isinstance(raw, str)]
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO entries (kind, raw, clean, added) VALUES (?, ?, ?, ?)", rows)
+                pruned = _prune(conn, max_rows)
+            known.update((raw, clean) for _, raw, clean, _ in rows)
+            # Entri yang dibuang dari disk ikut dibuang dari salinan memori (tanpa membaca ulang seluruh cache)
+            for pruned_kind, raw in pruned:
+                cached = _loaded.get((path, pruned_kind))
+                if cached is not None:
+                    cached[1].pop(raw, None)
+        finally:
+            conn.close()
+    return result
+
+def clear_contact_cache(path: str | None = None):
+    path = path or CONTACT_CACHE_PATH
+    with _lock:
+        conn = _connect(path)
+        try:
+            with conn:
+                conn.execute("DELETE FROM entries")
+                conn.execute("DELETE FROM versions")
+        finally:
+            conn.close()
+        for key in [k for k in _loaded if k[0] == path]:
+            del _loaded[key]
@@ -1,23 +1,128 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pandas.tseries.api import guess_datetime_format
 
-def clean_empty_rows(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean empty rows from dataframe"""
-    df = df.dropna(how="any")
-    df = df[~df.apply(lambda row: row.astype(str).str.strip().eq("").any(), axis=1)]
+def _is_text(s: pd.Series) -> bool:
+    # Kolom numerik / datetime / bool tidak mungkin bernilai string kosong
+    return not (
+        pd.api.types.is_numeric_dtype(s)
+        or pd.api.types.is_datetime64_any_dtype(s)
+        or pd.api.types.is_bool_dtype(s)
+    )
+
+def _blank_mask(s: pd.Series, strip: bool) -> pd.Series:
+    if not _is_text(s):
+        return pd.Series(False, index=s.index)
+    text = s.astype(str)
+    if strip:
+        text = text.str.strip()
+    return text.eq("")
+
+# Aturan validasi: nama -> fungsi(Series) yang mengembalikan mask baris yang DITOLAK
+VALIDATION_RULES = {
+    "not_null": lambda s: s.isna(),
+    "not_empty": lambda s: _blank_mask(s, strip=False),
+    "not_blank": lambda s: _blank_mask(s, strip=True),
+}
+
+def validate_rows(
+    df: pd.DataFrame,
+    rules: dict | None = None,
+    default_rules: tuple = ("not_null", "not_blank"),
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validasi baris secara kolumnar (satu operasi vektor per kolom per aturan).
+
+    rules : {kolom: [nama aturan di VALIDATION_RULES, ...]}. Jika None, semua kolom
+            memakai default_rules. Kolom yang tidak ada di df diabaikan.
+
+    Return: (df_valid, summary)
+    - summary berisi kolom "Column", "Rule", "Rejected" (jumlah baris yang gagal
+      aturan tersebut; satu baris bisa gagal di lebih dari satu aturan).
+    """
+    if rules is None:
+        rules = {col: list(default_rules) for col in df.columns}
+
+    rejected = np.zeros(len(df), dtype=bool)
+    summary = []
+    for col, col_rules in rules.items():
+        if col not in df.columns:
+            continue
+        for rule in col_rules:
+            mask = VALIDATION_RULES[rule](df[col]).to_numpy(dtype=bool)
+            summary.append({"Column": col, "Rule": rule, "Rejected": int(mask.sum())})
+            rejected |= mask
+
+    summary = pd.DataFrame(summary, columns=["Column", "Rule", "Rejected"])
+    return df[~rejected], summary
+
+def clean_empty_rows(df: pd.DataFrame, subset: list | None = None) -> pd.DataFrame:
+    """
+    Clean empty rows from dataframe.
+    Ringkasan baris yang dibuang disimpan di df.attrs: "rejected_rows" (jumlah baris) dan
+    "rejected_by_column" ({kolom: jumlah baris kosong}, hanya kolom yang menolak baris).
+    """
+    cols = list(df.columns) if subset is None else subset
+    n_rows = len(df)
+    df, summary = validate_rows(df, {col: ["not_null", "not_blank"] for col in cols})
+    by_column = summary.groupby("Column", sort=False)["Rejected"].sum()
+    df.attrs["rejected_rows"] = n_rows - len(df)
+    df.attrs["rejected_by_column"] = {col: int(n) for col, n in by_column.items() if n}
     return df
 
 def drop_unused_columns(df: pd.DataFrame, cols_to_drop: list) -> pd.DataFrame:
     return df.drop(columns=cols_to_drop, errors="ignore")
 
+# String yang dibaca pandas sebagai tanggal kosong (NaT), bukan contoh format
+_NAT_STRINGS = {"", "nan", "nat", "none", "null"}
+
+def first_date_value(values):
+    """Nilai pertama yang bisa dipakai menebak format: string kosong / spasi / "NaN" dilewati seperti null."""
+    return next(
+        (v for v in values if isinstance(v, str) and v.strip().lower() not in _NAT_STRINGS),
+        None,
+    )
+
+def infer_date_format(value, dayfirst: bool = False) -> str | None:
+    """
+    Format tanggal yang dikunci untuk satu kolom, ditebak dari nilai pertama (seperti pd.to_datetime).
+    "mixed" jika tidak bisa ditebak (tiap nilai di-parse bebas); None jika nilai bukan string.
+    """
+    if not isinstance(value, str):
+        return None
+    return guess_datetime_format(value, dayfirst=dayfirst) or "mixed"
+
+def _parse_dates_unique(s: pd.Series, dayfirst: bool, utc: bool, fmt: str | None) -> pd.Series:
+    """
+    Parse setiap string tanggal unik sekali lalu petakan kembali ke semua baris.
+    Format dikunci per kolom: `fmt` jika diberikan, jika tidak ditebak dari nilai non-kosong pertama
+    (lihat first_date_value & infer_date_format).
+    """
+    codes, uniques = pd.factorize(s)
+    if fmt is None and len(uniques):
+        fmt = infer_date_format(first_date_value(uniques), dayfirst)
+    parsed = pd.to_datetime(uniques, errors="coerce", format=fmt, dayfirst=dayfirst, utc=utc)
+    parsed = pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(parsed, index=s.index, name=s.name)
+
 def convert_to_datetime(
     df: pd.DataFrame, 
     date_cols: list,
     dayfirst: bool = False,
-    utc: bool = False
+    utc: bool = False,
+    formats: dict | None = None,
 ) -> pd.DataFrame:
+    """formats: {kolom: format strftime} opsional untuk mengunci format tanggal kolom tertentu."""
+    formats = formats or {}
     for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=dayfirst, utc=utc)
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], utc=utc)
+        else:
+            df[col] = _parse_dates_unique(df[col], dayfirst, utc, formats.get(col))
     return df
 
 def split_multi_items(df: pd.DataFrame, multi_item_cols: list) -> pd.DataFrame:
@@ -32,3 +137,70 @@ def strip_and_explode(df: pd.DataFrame, multi_item_cols: list) -> pd.DataFrame:
         if col in df.columns:
             df[col] = df[col].astype(str).str.strip()
     return df
+
+def _as_arrow_strings(s: pd.Series) -> pa.Array:
+    # Setara s.astype(str): null menjadi "nan"; kolom ber-dtype Arrow tidak melewati objek Python
+    if isinstance(s.dtype, pd.ArrowDtype) and pa.types.is_string(s.dtype.pyarrow_dtype):
+        return pa.array(s.array, type=pa.large_string()).fill_null("nan")
+    return pa.array(s.astype(str).to_numpy(dtype=object), type=pa.large_string())
+
+def explode_multi_items(
+    df: pd.DataFrame,
+    multi_item_cols: list,
+    sep: str = ";",
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Pengganti split_multi_items + strip_and_explode tanpa membuat list Python per baris.
+
+    Setiap kolom dipecah sekali menjadi satu buffer string datar + jumlah item per baris
+    (pyarrow). Baris induk diulang dengan np.repeat, nilai item diambil dari buffer
+    lalu di-strip. Baris yang jumlah itemnya berbeda antar kolom tidak di-explode
+    dan dikembalikan terpisah sebagai laporan.
+
+    Return: (df_exploded, df_mismatch)
+    - df_exploded : satu baris per item, index mengikuti baris asal (seperti DataFrame.explode)
+    - df_mismatch : baris asal yang jumlah itemnya tidak sama + kolom "<col> Count"
+    """
+    cols = [c for c in multi_item_cols if c in df.columns]
+    if not cols:
+        return df, df.iloc[0:0]
+
+    n_rows = len(df)
+    flat, counts = {}, {}
+    for col in cols:
+        arr = _as_arrow_strings(df[col])
+        items = pc.split_pattern(arr, sep)
+        flat[col] = pc.list_flatten(items)
+        counts[col] = pc.list_value_length(items).to_numpy(zero_copy_only=False).astype(np.int64)
+
+    ref = counts[cols[0]]
+    ok = np.ones(n_rows, dtype=bool)
+    for col in cols[1:]:
+        ok &= counts[col] == ref
+
+    mismatch = df.iloc[np.flatnonzero(~ok)].copy()
+    for col in cols:
+        mismatch[f"{col} Count"] = counts[col][~ok]
+
+    # Ulang baris induk sesuai jumlah item (index arithmetic, bukan explode)
+    parent = np.repeat(np.arange(n_rows), np.where(ok, ref, 0))
+    out = df.iloc[parent].copy()
+    for col in cols:
+        keep = np.repeat(ok, counts[col])
+        values = pc.utf8_trim_whitespace(flat[col].filter(pa.array(keep)))
+        out[col] = values.to_numpy(zero_copy_only=False)
+
+    return out, mismatch
+
+def map_unique(s: pd.Series, func) -> pd.Series:
+    """
+    Terapkan func hanya ke nilai unik non-null lalu petakan kembali ke semua baris.
+    func menerima Series object berisi nilai unik dan mengembalikan hasil dengan panjang sama.
+    Baris null menjadi None.
+    """
+    codes, uniques = pd.factorize(s)
+    values = np.empty(len(uniques) + 1, dtype=object)
+    if len(uniques):
+        values[:-1] = np.asarray(func(pd.Series(np.asarray(uniques, dtype=object), dtype=object)), dtype=object)
+    values[-1] = None
+    return pd.Series(values[codes], index=s.index, name=s.name)
@@ -1,5 +1,162 @@
+import re
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+def _arrow_source(file):
+    """Sumber baca untuk pyarrow tanpa menyalin isi upload (BytesIO/UploadedFile -> buffer)."""
+    if hasattr(file, "getbuffer"):
+        return pa.BufferReader(pa.py_buffer(file.getbuffer()))
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return file
+
+def _column_selector(columns: list | None, column_patterns: list | None):
+    """
+    Callable nama_kolom -> bool. Kolom dipakai jika namanya ada di `columns`
+    atau cocok dengan salah satu regex di `column_patterns` (case-insensitive, seperti map_columns).
+    """
+    if columns is None and column_patterns is None:
+        return None
+    names = set(columns or [])
+    regexes = [re.compile(p, flags=re.IGNORECASE) for p in (column_patterns or [])]
+    return lambda col: col in names or any(r.search(col) for r in regexes)
+
+def _predicate_mask(frame: pd.DataFrame, filters: list) -> np.ndarray:
+    """
+    Evaluasi filter baris sederhana. Tiap filter: (kolom, operator, nilai)
+    - "==" / "!="         : sama / tidak sama dengan nilai
+    - "in" / "not in"     : termasuk / tidak termasuk list nilai
+    - "between"           : (awal, akhir) inklusif; kolom non-numerik dibaca sebagai tanggal
+                            (batas akhir tanpa jam mencakup seluruh hari tersebut)
+    """
+    mask = np.ones(len(frame), dtype=bool)
+    for col, op, value in filters:
+        s = frame[col]
+        if op == "==":
+            m = s == value
+        elif op == "!=":
+            m = s != value
+        elif op == "in":
+            m = s.isin(value)
+        elif op == "not in":
+            m = ~s.isin(value)
+        elif op == "between":
+            lo, hi = value
+            if pd.api.types.is_numeric_dtype(s):
+                m = s.between(lo, hi)
+            else:
+                s = pd.to_datetime(s, errors="coerce")
+                lo, hi = pd.to_datetime(lo), pd.to_datetime(hi)
+                if hi == hi.normalize():
+                    # "2025-01-31" berarti sampai akhir hari itu, bukan tengah malam
+                    m = (s >= lo) & (s < hi + pd.Timedelta(days=1))
+                else:
+                    m = s.between(lo, hi)
+        else:
+            raise ValueError(f"Operator filter tidak dikenal: {op}")
+        mask &= m.fillna(False).to_numpy(dtype=bool)
+    return mask
+
+# Nilai yang dibaca sebagai kosong (NaN), sama dengan default na_values pd.read_csv
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+def _arrow_options(file, column_types, columns, column_patterns, block_size=None):
+    read_options = pv.ReadOptions(use_threads=True)
+    if block_size:
+        read_options.block_size = block_size
+    # Kolom string juga boleh null agar "NA" / "" menjadi kosong seperti pd.read_csv, bukan teks literal
+    convert_options = pv.ConvertOptions(
+        column_types=column_types or {},
+        null_values=CSV_NULL_VALUES,
+        strings_can_be_null=True,
+    )
+
+    select = _column_selector(columns, column_patterns)
+    if select is not None:
+        reader = pv.open_csv(_arrow_source(file), read_options=read_options)
+        header = reader.schema.names
+        reader.close()
+        convert_options.include_columns = [col for col in header if select(col)]
+    return read_options, convert_options
+
+def iter_csv_batches(
+    file,
+    column_types: dict | None = None,
+    columns: list | None = None,
+    column_patterns: list | None = None,
+    filters: list | None = None,
+    block_size: int | None = None,
+):
+    """
+    Baca CSV secara streaming: yield pa.RecordBatch berukuran ~block_size byte CSV.
+    Proyeksi kolom & filter sama seperti read_csv_arrow, diterapkan per batch.
+    """
+    read_options, convert_options = _arrow_options(file, column_types, columns, column_patterns, block_size)
+    reader = pv.open_csv(_arrow_source(file), read_options=read_options, convert_options=convert_options)
+
+    pred_cols = list(dict.fromkeys(col for col, _, _ in filters or []))
+    try:
+        for batch in reader:
+            if filters:
+                frame = pa.Table.from_batches([batch]).select(pred_cols).to_pandas(types_mapper=pd.ArrowDtype)
+                batch = batch.filter(pa.array(_predicate_mask(frame, filters)))
+            yield batch
+    finally:
+        reader.close()
+
+def read_csv_arrow(
+    file,
+    column_types: dict | None = None,
+    columns: list | None = None,
+    column_patterns: list | None = None,
+    filters: list | None = None,
+) -> pa.Table:
+    """
+    Parse CSV multithread dengan pyarrow; column_types = skema eksplisit {kolom: pa.DataType}.
+    Kolom yang tidak dipilih tidak pernah di-parse; filter diterapkan per batch saat streaming.
+    """
+    if filters:
+        batches = list(iter_csv_batches(file, column_types, columns, column_patterns, filters))
+        if batches:
+            return pa.Table.from_batches(batches)
+
+    read_options, convert_options = _arrow_options(file, column_types, columns, column_patterns)
+    table = pv.read_csv(_arrow_source(file), read_options=read_options, convert_options=convert_options)
+    return table.slice(0, 0) if filters else table
+
+def load_csv(
+    file: str,
+    engine: str = "pandas",
+    column_types: dict | None = None,
+    columns: list | None = None,
+    column_patterns: list | None = None,
+    filters: list | None = None,
+) -> pd.DataFrame:
+    """
+    Load data dari file CSV
+
+    engine="pandas" : pd.read_csv biasa
+    engine="arrow"  : parser pyarrow multithread, hasil DataFrame ber-dtype Arrow (pd.ArrowDtype)
+
+    columns / column_patterns : hanya kolom ini (nama persis / regex) yang di-parse
+    filters : list (kolom, operator, nilai), lihat _predicate_mask; baris dibuang saat parsing
+    """
+    if engine == "arrow":
+        table = read_csv_arrow(file, column_types, columns, column_patterns, filters)
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    usecols = _column_selector(columns, column_patterns)
+    if not filters:
+        return pd.read_csv(file, usecols=usecols)
 
-def load_csv(file: str) -> pd.DataFrame:
-    """Load data dari file CSV"""
-    return pd.read_csv(file)
+    chunks = [
+        chunk[_predicate_mask(chunk, filters)]
+        for chunk in pd.read_csv(file, usecols=usecols, chunksize=200_000)
+    ]
+    return pd.concat(chunks)
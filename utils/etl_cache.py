@@ -0,0 +1,55 @@
+import hashlib
+import threading
+
+import pandas as pd
+from cachetools import LRUCache
+
+# Cache hasil ETL dipakai bersama oleh semua halaman (level modul = level proses Streamlit)
+ETL_CACHE_SIZE = 4
+_etl_cache = LRUCache(maxsize=ETL_CACHE_SIZE)
+_lock = threading.Lock()
+
+def file_fingerprint(file) -> str:
+    """Hash isi file upload (UploadedFile / file-like / path) tanpa memindahkan posisi baca."""
+    if hasattr(file, "getbuffer"):
+        with file.getbuffer() as data:
+            return hashlib.blake2b(data, digest_size=16).hexdigest()
+    if hasattr(file, "getvalue"):
+        data = file.getvalue()
+    elif hasattr(file, "read"):
+        pos = file.tell()
+        data = file.read()
+        file.seek(pos)
+    else:
+        with open(file, "rb") as f:
+            data = f.read()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _shallow_copy(result):
+    # Salinan dangkal: halaman boleh menambah/mengganti kolom tanpa merusak isi cache
+    if isinstance(result, tuple):
+        return tuple(part.copy(deep=False) for part in result)
+    return result.copy(deep=False)
+
+def cached_etl(etl_fn, file, version, fingerprint: str | None = None, **kwargs):
+    """
+    Jalankan etl_fn(file, **kwargs) sekali per isi file, versi ETL & argumen.
+    Rerun dengan upload yang sama langsung mengambil hasil dari cache (LRU).
+    Hasil = DataFrame, atau tuple DataFrame.
+    fingerprint : hasil file_fingerprint(file) yang sudah dihitung halaman (file tidak di-hash ulang)
+    """
+    fingerprint = fingerprint or file_fingerprint(file)
+    key = (etl_fn.__module__, etl_fn.__name__, version, repr(sorted(kwargs.items())), fingerprint)
+    with _lock:
+        result = _etl_cache.get(key)
+    if result is None:
+        if hasattr(file, "seek"):
+            file.seek(0)
+        result = etl_fn(file, **kwargs)
+        with _lock:
+            _etl_cache[key] = result
+    return _shallow_copy(result)
+
+def clear_etl_cache():
+    with _lock:
+        _etl_cache.clear()
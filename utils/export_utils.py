@@ -0,0 +1,77 @@
+import io
+import tempfile
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Jumlah baris per potongan saat menulis CSV ke dalam ZIP
+EXPORT_CHUNK_ROWS = 50_000
+# Arsip di atas ukuran ini ditampung di file sementara, bukan di memori
+SPOOL_MAX_SIZE = 32 << 20
+
+def _write_csv(zf: zipfile.ZipFile, name: str, frames: list, columns):
+    # CSV ditulis per potongan langsung ke entri ZIP (terkompresi), header hanya sekali
+    with zf.open(name, "w", force_zip64=True) as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+        header = True
+        for df in frames:
+            for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+                chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS].reindex(columns=columns)
+                chunk.to_csv(text, index=False, header=header)
+                header = False
+        if header:
+            pd.DataFrame(columns=columns).to_csv(text, index=False)
+
+def _column_types(frames: list) -> dict:
+    # Tipe per kolom dari kolom yang memang dimiliki frame (bukan hasil reindex); kolom null diabaikan
+    schemas = [pa.Schema.from_pandas(df, preserve_index=False) for df in frames]
+    unified = pa.unify_schemas(schemas) if schemas else pa.schema([])
+    return {f.name: f.type for f in unified if f.type != pa.null()}
+
+def _to_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    # Kolom yang tidak dimiliki frame diisi null bertipe sesuai skema (bukan NaN double dari reindex)
+    own = pa.schema([f for f in schema if f.name in df.columns])
+    table = pa.Table.from_pandas(df[own.names], schema=own, preserve_index=False)
+    arrays = [
+        table.column(f.name) if f.name in own.names else pa.nulls(len(df), f.type)
+        for f in schema
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def _write_parquet(zf: zipfile.ZipFile, name: str, frames: list, columns):
+    # Frame berisi data menentukan tipe kolom; frame kosong hanya untuk kolom yang tidak ada di frame lain
+    # (kolom kosong / hasil reindex dibaca sebagai double dan bentrok dengan string)
+    types = _column_types([df for df in frames if len(df)])
+    types = {**_column_types([df for df in frames if not len(df)]), **types}
+    schema = pa.schema([(c, types.get(c, pa.string())) for c in columns])
+    with zf.open(name, "w", force_zip64=True) as raw:
+        with pq.ParquetWriter(raw, schema) as writer:
+            for df in frames:
+                writer.write_table(_to_table(df, schema))
+
+def write_frames_zip(frames: dict, fileobj, formats: tuple = ("csv",), combined_name: str | None = None):
+    """
+    Tulis beberapa DataFrame ke satu arsip ZIP (deflate) di fileobj.
+    - frames        : {nama file tanpa ekstensi: DataFrame}
+    - formats       : ("csv",), ("parquet",) atau keduanya
+    - combined_name : jika diisi, gabungan semua frame ikut ditulis dengan nama ini
+    Tiap file ditulis bertahap ke arsip, tidak pernah dibuat utuh sebagai bytes di memori.
+    """
+    writers = {"csv": _write_csv, "parquet": _write_parquet}
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for fmt in formats:
+            write = writers[fmt]
+            for name, df in frames.items():
+                write(zf, f"{name}.{fmt}", [df], df.columns)
+            if combined_name is not None:
+                columns = pd.concat([df.iloc[0:0] for df in frames.values()]).columns if frames else []
+                write(zf, f"{combined_name}.{fmt}", list(frames.values()), columns)
+    return fileobj
+
+def build_zip(frames: dict, formats: tuple = ("csv",), combined_name: str | None = None) -> bytes:
+    """write_frames_zip ke file sementara (spill ke disk jika besar) lalu kembalikan isi arsip."""
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as tmp:
+        write_frames_zip(frames, tmp, formats, combined_name)
+        tmp.seek(0)
+        return tmp.read()
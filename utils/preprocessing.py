@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def convert_numeric(df: pd.DataFrame, numeric_cols: list) -> pd.DataFrame:
@@ -10,4 +11,50 @@ def convert_to_nullable_int(df: pd.DataFrame, int_cols: list) -> pd.DataFrame:
     for col in int_cols:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
-    return df
\ No newline at end of file
+    return df
+
+def _smallest_int(s: pd.Series, min_itemsize: int = 1) -> pd.Series:
+    """Cast ke tipe integer terkecil yang muat; NaN -> tipe nullable (Int8/Int16/...). Nilai pecahan dibiarkan."""
+    if not pd.api.types.is_numeric_dtype(s):
+        return s
+    values = s.dropna()
+    if values.empty or not np.isfinite(values).all() or not (values == values.round()).all():
+        return s
+    for bits in (8, 16, 32, 64):
+        info = np.iinfo(f"int{bits}")
+        if bits // 8 >= min_itemsize and values.min() >= info.min and values.max() <= info.max:
+            break
+    else:
+        return s
+    dtype = f"Int{bits}" if s.isna().any() else f"int{bits}"
+    return s.astype(dtype)
+
+def apply_compact_schema(
+    df: pd.DataFrame,
+    categorical_cols: list,
+    count_cols: list,
+    amount_cols: list,
+    max_category_ratio: float = 0.5,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Simpan kolom dengan tipe ringkas:
+    - categorical_cols : category (jika jumlah nilai unik <= max_category_ratio * jumlah baris)
+    - count_cols       : integer terkecil yang muat (int8/int16/...)
+    - amount_cols      : int64 (Rupiah, nilai pasti tanpa float)
+
+    Return: (df, report) dengan report {"memory_before", "memory_after"} dalam byte.
+    """
+    before = int(df.memory_usage(deep=True).sum())
+
+    for col in categorical_cols:
+        if col in df.columns and df[col].nunique(dropna=True) <= max_category_ratio * max(len(df), 1):
+            df[col] = df[col].astype("category")
+    for col in count_cols:
+        if col in df.columns:
+            df[col] = _smallest_int(df[col])
+    for col in amount_cols:
+        if col in df.columns:
+            df[col] = _smallest_int(df[col], min_itemsize=8)
+
+    after = int(df.memory_usage(deep=True).sum())
+    return df, {"memory_before": before, "memory_after": after}
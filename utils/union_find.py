@@ -0,0 +1,32 @@
+import numpy as np
+
+def _compress(parent: np.ndarray) -> np.ndarray:
+    # Pointer jumping: setiap node langsung menunjuk ke root-nya
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return parent
+        parent = grand
+
+def connected_components(a: np.ndarray, b: np.ndarray, n: int) -> np.ndarray:
+    """
+    Union-find tervektorisasi atas node integer 0..n-1 dengan edge (a[i], b[i]).
+    Tiap putaran menggabungkan root yang lebih besar ke root yang lebih kecil untuk semua edge
+    sekaligus, lalu memadatkan path; jumlah putaran kecil (~log n) sehingga total hampir linear.
+
+    Return: label per node = node terkecil dalam komponennya.
+    """
+    parent = np.arange(n, dtype=np.int64)
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    while len(a):
+        ra, rb = parent[a], parent[b]
+        differ = ra != rb
+        if not differ.any():
+            break
+        ra, rb = ra[differ], rb[differ]
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+        parent = _compress(parent)
+        # Edge yang sudah satu komponen tidak perlu dicek lagi
+        a, b = a[differ], b[differ]
+    return parent
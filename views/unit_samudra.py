@@ -8,22 +8,25 @@ from modules.transaction_visualization import (
     show_top5_purchased,
     show_rfm_segmentation,
     show_customer_segmentation,
+    show_item_table,
 )
-from utils.ui_utils import render_aggrid, download_csv_button
+from modules.transaction_model import filter_model, CHART_COLS, item_view
 
 def show():
-    df = st.session_state.get("df_transaksi")
-    df_unit = df[df["Ticket Group"] == "Samudra Ancol"]
+    transactions, items = st.session_state.get("txn_model")
+    transactions, items = filter_model(transactions, items, item_mask=items["Ticket Group"] == "Samudra Ancol")
 
     st.header("Unit Samudra", divider="gray")
 
-    min_date, max_date = df_unit["Tgl Transaksi"].min(), df_unit["Tgl Transaksi"].max()
+    min_date, max_date = transactions["Tgl Transaksi"].min(), transactions["Tgl Transaksi"].max()
     start_date, end_date = st.date_input(
         "Pilih rentang tanggal (Samudra):", [min_date, max_date],
         min_value=min_date, max_value=max_date
     )
-    mask = (df_unit["Tgl Transaksi"] >= pd.to_datetime(start_date)) & (df_unit["Tgl Transaksi"] <= pd.to_datetime(end_date))
-    df_filtered = df_unit.loc[mask]
+    mask = (transactions["Tgl Transaksi"] >= pd.to_datetime(start_date)) & (transactions["Tgl Transaksi"] <= pd.to_datetime(end_date))
+    transactions, items = filter_model(transactions, items, txn_mask=mask)
+    # Chart cukup kolom ringkas; view lengkap hanya untuk tabel / download
+    df_filtered = item_view(transactions, items, columns=CHART_COLS)
 
     # Summary cards
     show_summary_cards(df_filtered)
@@ -43,13 +46,10 @@ def show():
         st.altair_chart(show_top5_purchased(df_filtered), use_container_width=True)
 
     # 🔹 Customer Segmentation
-    show_customer_segmentation(df_filtered)
+    show_customer_segmentation(transactions, items)
 
     # 🔹 RFM Segmentation
-    show_rfm_segmentation(df_filtered)  
+    show_rfm_segmentation(transactions, items)  
 
-    # AgGrid
-    render_aggrid(df_filtered)
-
-    # Download button
-    download_csv_button(df_filtered, filename="transaksi_ancol.csv")
+    # AgGrid & download CSV
+    show_item_table(transactions, items, filename="transaksi_ancol.csv", key="tabel_samudra")